@@ -1,14 +1,19 @@
 import logging
 
+from src.utils.startup import startup_timer
 
 import streamlit as st
 
+startup_timer.mark("import streamlit")
 
 from src.app.app import ExpenseTrackerApp
 
+startup_timer.mark("import app")
+
 if __name__ == "__main__":
     # Configure logging
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     ExpenseTrackerApp().main()
+    startup_timer.finish()
 
 
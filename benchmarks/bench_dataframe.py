@@ -0,0 +1,82 @@
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime as dt, timedelta
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from src.definitions.constants import DATE
+from src.utils.utils import EXPENSE_CATEGORIES, response_as_dataframe
+
+"""
+Micro-benchmark for response_as_dataframe against the previous implementation.
+
+Run from the repository root:
+    python -m benchmarks.bench_dataframe --rows 1000 100000 1000000
+"""
+
+
+def legacy_response_as_dataframe(response: List[Dict[str, Any]]):
+    df = pd.DataFrame(response)
+    if len(df) == 0:
+        return df
+    df.columns = [c.upper() for c in df.columns]
+    df[DATE] = pd.to_datetime(df[DATE])
+    df = df.sort_values(by=DATE, ascending=True)
+    df = df.drop(columns=['USER'])
+    return df
+
+
+def make_response(rows: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = dt(2020, 1, 1)
+    return [
+        dict(
+            user="benchmark",
+            category=rng.choice(EXPENSE_CATEGORIES),
+            description=f"expense {i}",
+            amount=round(rng.uniform(1, 5000), 2),
+            date=(start + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+        for i in range(rows)]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dict(best_seconds=min(timings), peak_bytes=peak)
+
+
+def run(rows: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for n in rows:
+        response = make_response(n)
+        legacy = measure(lambda: legacy_response_as_dataframe(response), repeat)
+        current = measure(lambda: response_as_dataframe(response), repeat)
+        presorted = measure(lambda: response_as_dataframe(response, assume_sorted=True), repeat)
+        results.append(dict(
+            rows=n,
+            legacy=legacy,
+            current=current,
+            current_assume_sorted=presorted,
+            speedup=legacy["best_seconds"] / current["best_seconds"],
+            peak_memory_ratio=current["peak_bytes"] / legacy["peak_bytes"]))
+        del response
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response_as_dataframe.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
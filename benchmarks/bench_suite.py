@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime as dt, timedelta
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_dataframe import make_response, measure
+from benchmarks.mock_backend import MockBackend
+
+"""
+End-to-end and hot-path benchmarks against the mock backend. Output is JSON so runs can be diffed across commits.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite --rows 10000 100000 --latency 0.05 --out results.json
+"""
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def bench_dashboard_flow(base_url: str, user: str, chart_backend: str, repeat: int) -> Dict[str, Any]:
+    # Mirrors what the app does between pressing Login and the dashboard being ready, minus Streamlit itself.
+    os.environ["SERVER_BASE_URL"] = base_url
+    from src.app.plots import Plots, chart_cache
+    from src.definitions.env_variables import EnvVariables
+    from src.services.async_server import AsyncServer
+    from src.services.server import Server
+    from src.definitions.enums import Period
+    from src.utils.periods import as_request_dates, period_bounds
+    from src.utils.rollups import ExpenseRollup
+    from src.utils.utils import response_as_dataframe
+
+    start_date, end_date = period_bounds(Period.MONTH, dt.now().date())
+    request_start, request_end = as_request_dates(start_date, end_date)
+    plots = Plots(chart_backend)
+
+    def run_flow(server: Server, async_server: AsyncServer) -> Dict[str, float]:
+        steps = {}
+        steps["login"] = _timed(lambda: server.login_user(user, "benchmark"))
+        dashboard = None
+
+        def fetch():
+            nonlocal dashboard
+            dashboard = async_server.run(async_server.fetch_dashboard(
+                user=user, start_date=request_start, end_date=request_end,
+                history_page_size=EnvVariables.history_page_size()))
+        steps["fetch_dashboard"] = _timed(fetch)
+        df = None
+
+        def convert():
+            nonlocal df
+            df = response_as_dataframe(dashboard.monthly_data or [])
+        steps["dataframe"] = _timed(convert)
+        rollup = None
+
+        def aggregate():
+            nonlocal rollup
+            rollup = ExpenseRollup.from_dataframe(df, start_date, end_date)
+        steps["rollup"] = _timed(aggregate)
+        steps["chart"] = _timed(lambda: plots.render_monthly_expenses_bar_chart(rollup))
+        steps["total"] = sum(steps.values())
+        steps["rows"] = len(df)
+        return steps
+
+    cold, warm = [], []
+    for _ in range(repeat):
+        chart_cache.clear()
+        server = Server()
+        async_server = AsyncServer(server)
+        cold.append(run_flow(server, async_server))
+        warm.append(run_flow(server, async_server))
+        server.http.close()
+        async_server.executor.shutdown()
+    return dict(cold=_best(cold), warm=_best(warm))
+
+
+def bench_history(base_url: str, user: str, page_size: int) -> Dict[str, Any]:
+    os.environ["SERVER_BASE_URL"] = base_url
+    from src.services.server import Server
+
+    server = Server()
+    rows = 0
+    started = time.perf_counter()
+    for page in server.iter_historical_data(user, page_size=page_size, use_cache=False):
+        rows += len(page)
+    elapsed = time.perf_counter() - started
+    stats = server.connection_stats()
+    server.http.close()
+    return dict(rows=rows, page_size=page_size, seconds=elapsed, connections=stats["new_connections"])
+
+
+def bench_store(base_url: str, user: str, rows: int) -> Dict[str, Any]:
+    os.environ["SERVER_BASE_URL"] = base_url
+    from src.services.server import Server
+
+    server = Server()
+    payloads = [dict(username=user, category=row["category"], description=row["description"],
+                     amount=row["amount"], date=time.time() * 1000) for row in make_response(rows)]
+    single = _timed(lambda: [server.store_data_to_db(payload) for payload in payloads])
+    batch = _timed(lambda: server.store_batch_to_db(user, payloads))
+    server.http.close()
+    return dict(rows=rows, single_seconds=single, batch_seconds=batch)
+
+
+def bench_chat_stream(base_url: str, user: str, repeat: int) -> Dict[str, Any]:
+    os.environ["SERVER_BASE_URL"] = base_url
+    from src.services.server import Server
+
+    server = Server()
+    for i in range(repeat):
+        # Distinct prompts so the answer cache does not short-circuit the stream.
+        "".join(server.stream_message_to_chatbot(user, f"benchmark question {i}"))
+    stats = server.chat_stream_stats()
+    server.http.close()
+    return stats
+
+
+def bench_hot_paths(rows: int, repeat: int) -> Dict[str, Any]:
+    from src.app.plots import CHART_BACKENDS
+    from src.utils.rollups import ExpenseRollup
+    from src.utils.utils import response_as_dataframe
+
+    response = make_response(rows)
+    df = response_as_dataframe(response)
+    # One daily bucket per day the synthetic data spans.
+    start_date = dt.combine(df["DATE"].min().date(), dt.min.time())
+    end_date = dt.combine(df["DATE"].max().date() + timedelta(days=1), dt.min.time())
+    results = dict(
+        rows=rows,
+        dataframe=measure(lambda: response_as_dataframe(response), repeat),
+        rollup=measure(lambda: ExpenseRollup.from_dataframe(df, start_date, end_date), repeat))
+    rollup = ExpenseRollup.from_dataframe(df, start_date, end_date)
+    for name, backend_class in CHART_BACKENDS.items():
+        backend = backend_class()
+        # Calls the renderer directly so the chart cache does not hide the cost.
+        results[f"chart_{name}"] = measure(lambda: backend._monthly_expenses_bar_chart(rollup), repeat)
+    return results
+
+
+def _best(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    return {key: min(run[key] for run in runs) for key in runs[0]}
+
+
+def run(rows: List[int], latency: float, token_latency: float, repeat: int, chart_backend: str,
+        history_page_size: int) -> Dict[str, Any]:
+    results = dict(
+        meta=dict(
+            commit=_git_commit(),
+            python=platform.python_version(),
+            timestamp=dt.now().isoformat(timespec="seconds"),
+            latency_seconds=latency,
+            token_latency_seconds=token_latency,
+            repeat=repeat,
+            chart_backend=chart_backend),
+        dashboard=[],
+        history=[],
+        hot_paths=[])
+    for n in rows:
+        with MockBackend(rows=n, days=90, latency=latency, token_latency=token_latency) as backend:
+            user = backend.data.users[0]
+            results["dashboard"].append(dict(rows=n, **bench_dashboard_flow(backend.base_url, user, chart_backend, repeat)))
+            results["history"].append(bench_history(backend.base_url, user, history_page_size))
+        results["hot_paths"].append(bench_hot_paths(n, repeat))
+    with MockBackend(rows=0, latency=latency, token_latency=token_latency) as backend:
+        results["store"] = bench_store(backend.base_url, "user0", rows=100)
+        results["chat_stream"] = bench_chat_stream(backend.base_url, "user0", repeat)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the app against a mock backend.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every mock request")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Seconds between streamed chat tokens")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chart-backend", default="vega-lite")
+    parser.add_argument("--history-page-size", type=int, default=5000)
+    parser.add_argument("--out", help="Write results here instead of stdout")
+    args = parser.parse_args()
+    output = json.dumps(run(args.rows, args.latency, args.token_latency, args.repeat, args.chart_backend,
+                            args.history_page_size), indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime as dt
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.bench_suite import _git_commit
+from benchmarks.mock_backend import MockBackend
+
+"""
+Load test of the multi-worker deployment: scripts/serve_workers.py is started with 1..N workers, and simulated
+browsers drive whole sessions through its sticky proxy over real HTTP and the Streamlit websocket protocol.
+
+Each session GETs the page (which sets the worker cookie), opens /_stcore/stream with that cookie and plays
+entry -> login -> dashboard -> next period as the browser would, waiting for each script run to finish. Reported per
+worker count: sessions per second, step latencies, how sessions spread over the workers, and the shared cache size.
+
+Run from the repository root:
+    python -m benchmarks.load_test --workers 1 2 4 --users 8 --duration 30 --latency 0.05
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_COOKIE = "expense_tracker_worker"
+
+
+class BrowserSession:
+    # Just enough of the Streamlit frontend: sends rerun requests with widget states, collects the widgets of each run.
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.cookie = ""
+        self.worker: Optional[str] = None
+        self.connection = None
+        self.widgets: Dict[Tuple[str, str], Any] = {}
+
+    async def open(self):
+        from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+        from tornado.websocket import websocket_connect
+
+        response = await AsyncHTTPClient().fetch(f"{self.base_url}/")
+        cookies = SimpleCookie()
+        for header in response.headers.get_list("Set-Cookie"):
+            cookies.load(header)
+        self.cookie = "; ".join(f"{name}={morsel.value}" for name, morsel in cookies.items())
+        self.worker = cookies[WORKER_COOKIE].value if WORKER_COOKIE in cookies else None
+        request = HTTPRequest(self.base_url.replace("http", "ws", 1) + "/_stcore/stream",
+                              headers={"Cookie": self.cookie, "Origin": self.base_url})
+        self.connection = await websocket_connect(request, subprotocols=["streamlit"])
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    async def run(self, widget_states: Optional[List[Any]] = None) -> float:
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.widget_states.widgets.extend(widget_states or [])
+        started = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        widgets: Dict[Tuple[str, str], Any] = {}
+        while True:
+            raw = await self.connection.read_message()
+            if raw is None:
+                raise ConnectionError("Websocket closed mid-run")
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                widgets = {}
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in ("button", "text_input"):
+                    widget = getattr(element, element_type)
+                    widgets[(element_type, widget.label)] = widget
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                self.widgets = widgets
+                return time.perf_counter() - started
+
+    def widget_id(self, element_type: str, label: str) -> str:
+        if (element_type, label) not in self.widgets:
+            raise RuntimeError(f"No {element_type} labelled {label!r} on screen: {sorted(self.widgets)}")
+        return self.widgets[(element_type, label)].id
+
+
+def _text(widget_id: str, value: str):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    return WidgetState(id=widget_id, string_value=value)
+
+
+def _click(widget_id: str):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    return WidgetState(id=widget_id, trigger_value=True)
+
+
+async def play_session(base_url: str, username: str) -> Dict[str, Any]:
+    browser = BrowserSession(base_url)
+    steps: Dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        await browser.open()
+        steps["connect"] = time.perf_counter() - started
+        steps["entry"] = await browser.run()
+        steps["login_screen"] = await browser.run([_click(browser.widget_id("button", "Login"))])
+        credentials = [_text(browser.widget_id("text_input", "Username"), username),
+                       _text(browser.widget_id("text_input", "Password"), "load-test")]
+        # Typing reruns the script too; the Login callback's arguments are bound from that run.
+        await browser.run(credentials)
+        steps["dashboard"] = await browser.run(credentials + [_click(browser.widget_id("button", "Login"))])
+        steps["next_period"] = await browser.run([_click(browser.widget_id("button", "▶"))])
+    finally:
+        browser.close()
+    steps["total"] = time.perf_counter() - started
+    return dict(worker=browser.worker, steps=steps)
+
+
+async def drive(base_url: str, users: List[str], concurrency: int, duration: float) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    deadline = time.perf_counter() + duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(index)
+        while time.perf_counter() < deadline:
+            try:
+                results.append(await play_session(base_url, rng.choice(users)))
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    per_worker: Dict[str, int] = {}
+    for result in results:
+        per_worker[str(result["worker"])] = per_worker.get(str(result["worker"]), 0) + 1
+    step_names = list(results[0]["steps"]) if results else []
+    return dict(
+        sessions=len(results),
+        errors=len(errors),
+        first_errors=errors[:3],
+        sessions_per_second=len(results) / elapsed,
+        steps={name: _percentiles([result["steps"][name] for result in results]) for name in step_names},
+        sessions_per_worker=dict(sorted(per_worker.items())))
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return dict(p50=ordered[len(ordered) // 2], p95=ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(base_url: str, process: subprocess.Popen, timeout: float = 120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("serve_workers.py exited during startup")
+        try:
+            with urllib.request.urlopen(f"{base_url}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError("Workers did not become healthy")
+
+
+def _shared_cache_entries(path: str) -> Dict[str, int]:
+    if not os.path.exists(path):
+        return {}
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT namespace, COUNT(*) FROM cache_entries GROUP BY namespace").fetchall())
+
+
+def run_deployment(workers: int, backend_url: str, users: List[str], concurrency: int, duration: float,
+                   warmup: float) -> Dict[str, Any]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "shared_cache.sqlite3")
+        env = dict(os.environ, SERVER_BASE_URL=backend_url,
+                   EXPENSE_JOURNAL_PATH=os.path.join(directory, "journal.sqlite3"))
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "scripts", "serve_workers.py"), "--workers", str(workers),
+             "--host", "127.0.0.1", "--port", str(port), "--worker-base-port", str(_free_port()),
+             "--shared-cache-url", f"sqlite:///{cache_path}"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_healthy(base_url, process)
+            # First sessions pay for imports and first renders in each worker; keep them out of the numbers.
+            asyncio.run(drive(base_url, users, concurrency, warmup))
+            result = asyncio.run(drive(base_url, users, concurrency, duration))
+            result["shared_cache_entries"] = _shared_cache_entries(cache_path)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=60)
+    return dict(workers=workers, **result)
+
+
+def run(workers: List[int], concurrency: int, rows: int, users: int, latency: float, duration: float,
+        warmup: float) -> Dict[str, Any]:
+    results = dict(
+        meta=dict(
+            commit=_git_commit(),
+            python=platform.python_version(),
+            cpus=os.cpu_count(),
+            timestamp=dt.now().isoformat(timespec="seconds"),
+            concurrency=concurrency,
+            rows=rows,
+            users=users,
+            latency_seconds=latency,
+            duration_seconds=duration),
+        runs=[])
+    with MockBackend(rows=rows, users=users, days=90, latency=latency) as backend:
+        for count in workers:
+            results["runs"].append(run_deployment(count, backend.base_url, backend.data.users, concurrency,
+                                                  duration, warmup))
+    baseline = results["runs"][0]["sessions_per_second"]
+    for result in results["runs"]:
+        result["speedup"] = result["sessions_per_second"] / baseline if baseline else None
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test serve_workers.py with 1..N workers.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--users", type=int, default=8, help="Concurrent simulated browsers")
+    parser.add_argument("--accounts", type=int, default=20, help="Distinct users in the mock backend")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every mock request")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--out", help="Write results here instead of stdout")
+    args = parser.parse_args()
+    output = json.dumps(run(args.workers, args.users, args.rows, args.accounts, args.latency, args.duration,
+                            args.warmup), indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
@@ -0,0 +1,238 @@
+import argparse
+import bisect
+import json
+import random
+import threading
+import time
+from datetime import datetime as dt, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from src.utils.utils import EXPENSE_CATEGORIES
+
+"""
+In-process stand-in for the Node API, serving every endpoint in Urls with configurable latency and dataset size.
+
+Serve it on its own (e.g. for the app or a load test) from the repository root:
+    python -m benchmarks.mock_backend --port 3900 --rows 100000 --latency 0.05
+then point the app at it with SERVER_BASE_URL=http://127.0.0.1:3900.
+"""
+
+REQUEST_DATE_FORMAT = "%m-%d-%Y"
+REPLY_TOKENS = ["You ", "spent ", "most ", "on ", "Leisure ", "this ", "month."]
+
+
+class MockData:
+    def __init__(self, rows: int, users: int, days: int, seed: int = 0):
+        rng = random.Random(seed)
+        now = dt.now()
+        self.users = [f"user{i}" for i in range(users)]
+        self.expenses: Dict[str, List[Dict[str, Any]]] = {user: [] for user in self.users}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        for i in range(rows):
+            user = self.users[i % users]
+            date = now - timedelta(minutes=rng.randrange(days * 24 * 60))
+            self.expenses[user].append(dict(
+                _id=self._new_id(),
+                user=user,
+                category=rng.choice(EXPENSE_CATEGORIES),
+                description=f"expense {i}",
+                amount=round(rng.uniform(1, 5000), 2),
+                date=date.timestamp() * 1000))
+        # Kept sorted by date with a parallel key list, so range queries are a bisect rather than a scan.
+        self.dates: Dict[str, List[float]] = {}
+        for user, rows_for_user in self.expenses.items():
+            rows_for_user.sort(key=lambda row: row["date"])
+            self.dates[user] = [row["date"] for row in rows_for_user]
+
+    def _new_id(self) -> str:
+        # Increasing and fixed-length, like a Mongo ObjectId.
+        self._next_id += 1
+        return f"{self._next_id:024x}"
+
+    def add(self, username: str, expense: Dict[str, Any]):
+        row = dict(user=username, category=expense.get("category"), description=expense.get("description"),
+                   amount=float(expense.get("amount") or 0), date=float(expense.get("date") or time.time() * 1000))
+        with self._lock:
+            row["_id"] = self._new_id()
+            dates = self.dates.setdefault(username, [])
+            index = bisect.bisect_right(dates, row["date"])
+            dates.insert(index, row["date"])
+            self.expenses.setdefault(username, []).insert(index, row)
+
+    def clear(self):
+        with self._lock:
+            for user in self.expenses:
+                self.expenses[user].clear()
+                self.dates[user].clear()
+
+    def rows_between(self, username: Optional[str], start: float, end: float) -> List[Dict[str, Any]]:
+        if not username:
+            return [row for row in self.rows(None) if start <= row["date"] < end]
+        with self._lock:
+            dates = self.dates.get(username, [])
+            return self.expenses.get(username, [])[bisect.bisect_left(dates, start):bisect.bisect_left(dates, end)]
+
+    def rows(self, username: Optional[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            if username:
+                return list(self.expenses.get(username, []))
+            return [row for rows in self.expenses.values() for row in rows]
+
+
+def _as_json_row(row: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    out = dict(row, date=dt.utcfromtimestamp(row["date"] / 1000).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z")
+    if fields:
+        out = {key: value for key, value in out.items() if key in fields}
+    return out
+
+
+def _request_ms(value: str) -> float:
+    return dt.strptime(value, REQUEST_DATE_FORMAT).timestamp() * 1000
+
+
+def make_handler(data: MockData, latency: float, token_latency: float):
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; without this, Nagle plus delayed ACKs adds ~40ms per reply.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _body(self) -> Dict[str, Any]:
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def _send_json(self, obj: Any, status: int = 200):
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self) -> str:
+            return self.path.rstrip("/").rsplit("/", 1)[-1]
+
+        def do_HEAD(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            body = self._body()
+            time.sleep(latency)
+            route = self._route()
+            if route == "monthly-data":
+                self._send_json(self._monthly_data(body))
+            elif route == "history":
+                self._send_json(self._history(body))
+            else:
+                self._send_json(dict(error="not found"), status=404)
+
+        def do_POST(self):
+            body = self._body()
+            time.sleep(latency)
+            route = self._route()
+            if route == "store":
+                data.add(body.get("username", ""), body)
+                self._send_json(dict(status="ok"))
+            elif route == "store-batch":
+                for expense in body.get("expenses", []):
+                    data.add(body.get("username", ""), expense)
+                self._send_json(dict(status="ok", stored=len(body.get("expenses", []))))
+            elif route == "clear-db":
+                data.clear()
+                self._send_json(dict(status="ok"))
+            elif route in ("auth-login", "auth-register"):
+                self._send_json(dict(name=body.get("username") or body.get("name") or "Benchmark"))
+            elif route == "send-message":
+                self._send_json(dict(message="".join(REPLY_TOKENS)))
+            elif route == "stream-message":
+                self._stream_reply()
+            else:
+                self._send_json(dict(error="not found"), status=404)
+
+        def _monthly_data(self, body: Dict[str, Any]) -> Dict[str, Any]:
+            start, end = _request_ms(body["start_date"]), _request_ms(body["end_date"])
+            categories = set(body.get("categories") or [])
+            min_amount, max_amount = body.get("min_amount"), body.get("max_amount")
+            rows = [
+                _as_json_row(row, body.get("fields")) for row in data.rows_between(body.get("username"), start, end)
+                if (not categories or row["category"] in categories)
+                and (min_amount is None or row["amount"] >= min_amount)
+                and (max_amount is None or row["amount"] <= max_amount)]
+            summary = f"{len(rows)} expenses this period." if rows else ""
+            return dict(data=rows, summary=summary)
+
+        def _history(self, body: Dict[str, Any]) -> Dict[str, Any]:
+            rows = data.rows(body.get("username"))
+            if body.get("after"):
+                rows = [row for row in rows if row["_id"] > body["after"]]
+            offset = body.get("offset", 0)
+            limit = body.get("limit", len(rows))
+            return dict(data=[_as_json_row(row, None) for row in rows[offset:offset + limit]])
+
+        def _stream_reply(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for token in REPLY_TOKENS + ["[DONE]"]:
+                event = token if token == "[DONE]" else json.dumps(dict(token=token))
+                chunk = f"data: {event}\n\n".encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+                time.sleep(token_latency)
+            self.wfile.write(b"0\r\n\r\n")
+
+    return MockHandler
+
+
+class MockBackend:
+    def __init__(self, rows: int = 10_000, users: int = 1, days: int = 365, latency: float = 0.0,
+                 token_latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.data = MockData(rows=rows, users=users, days=days)
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.data, latency, token_latency))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-backend", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockBackend":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockBackend":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a mock of the expense tracker API.")
+    parser.add_argument("--port", type=int, default=3900)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds between streamed chat tokens")
+    args = parser.parse_args()
+    backend = MockBackend(rows=args.rows, users=args.users, days=args.days, latency=args.latency,
+                          token_latency=args.token_latency, port=args.port)
+    print(f"Mock backend on {backend.base_url} with {args.rows} rows for {args.users} user(s)")
+    try:
+        backend.httpd.serve_forever()
+    except KeyboardInterrupt:
+        backend.httpd.server_close()
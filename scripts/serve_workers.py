@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import logging
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional
+
+"""
+Runs several Streamlit workers behind a sticky-session proxy.
+
+Each browser is pinned to one worker with a cookie, so its websocket, session state and st.cache_resource objects
+stay in one process. The response and chart caches live in the shared tier (SHARED_CACHE_URL), and SESSION_SECRET
+is shared, so a session token minted by one worker restores the login on any other.
+
+From the repository root:
+    python scripts/serve_workers.py --workers 4 --port 8080
+"""
+
+logger = logging.getLogger("serve_workers")
+
+COOKIE = "expense_tracker_worker"
+HEAD_LIMIT = 64 * 1024
+
+
+class Worker:
+    def __init__(self, index: int, port: int):
+        self.index = index
+        self.port = port
+        self.active = 0
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, env: Dict[str, str]):
+        self.process = subprocess.Popen([
+            sys.executable, "-m", "streamlit", "run", "app.py",
+            "--server.port", str(self.port),
+            "--server.address", "127.0.0.1",
+            "--server.headless", "true",
+        ], env=env)
+
+    def healthy(self) -> bool:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as response:
+                return response.status == 200
+        except OSError:
+            return False
+
+
+class StickyProxy:
+    def __init__(self, workers: List[Worker]):
+        self.workers = workers
+
+    def _pick(self, head: bytes) -> Worker:
+        cookies = SimpleCookie()
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"cookie":
+                try:
+                    cookies.load(value.strip().decode("latin-1"))
+                except Exception:
+                    pass
+        if COOKIE in cookies:
+            try:
+                return self.workers[int(cookies[COOKIE].value) % len(self.workers)]
+            except ValueError:
+                pass
+        # New browser: the least busy worker.
+        return min(self.workers, key=lambda worker: worker.active)
+
+    async def handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            client_writer.close()
+            return
+        worker = self._pick(head)
+        worker.active += 1
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+        except OSError:
+            worker.active -= 1
+            client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            client_writer.close()
+            return
+        # The connection stays on this worker from here on: later keep-alive requests and a websocket upgrade
+        # are piped through unchanged. Only the first response gets the cookie.
+        upstream_writer.write(head)
+        try:
+            response_head = await upstream_reader.readuntil(b"\r\n\r\n")
+            client_writer.write(_with_cookie(response_head, worker.index))
+            await asyncio.gather(
+                _pipe(client_reader, upstream_writer),
+                _pipe(upstream_reader, client_writer))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            worker.active -= 1
+            upstream_writer.close()
+            client_writer.close()
+
+
+def _with_cookie(response_head: bytes, index: int) -> bytes:
+    cookie = f"Set-Cookie: {COOKIE}={index}; Path=/; HttpOnly; SameSite=Lax\r\n".encode()
+    return response_head[:-2] + cookie + b"\r\n"
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            writer.write(chunk)
+            await writer.drain()
+    finally:
+        if writer.can_write_eof():
+            try:
+                writer.write_eof()
+            except OSError:
+                pass
+
+
+def worker_env(index: int, session_secret: str, shared_cache_url: str, cookie_secret: str) -> Dict[str, str]:
+    env = dict(os.environ, SESSION_SECRET=session_secret, SHARED_CACHE_URL=shared_cache_url,
+               STREAMLIT_SERVER_COOKIE_SECRET=cookie_secret)
+    # The write-behind journal is drained by the process that owns it; two workers on one file would both
+    # send the same entries. The replica is a per-process mirror as well.
+    env["EXPENSE_JOURNAL_PATH"] = _per_worker(os.getenv("EXPENSE_JOURNAL_PATH", ".expense_journal.sqlite3"), index)
+    if os.getenv("LOCAL_REPLICA_PATH"):
+        env["LOCAL_REPLICA_PATH"] = _per_worker(os.environ["LOCAL_REPLICA_PATH"], index)
+    return env
+
+
+def _per_worker(path: str, index: int) -> str:
+    stem, dot, extension = path.rpartition(".")
+    return f"{stem}.worker{index}.{extension}" if dot and stem else f"{path}.worker{index}"
+
+
+async def serve(workers: List[Worker], host: str, port: int):
+    proxy = StickyProxy(workers)
+    server = await asyncio.start_server(proxy.handle, host, port, limit=HEAD_LIMIT)
+    logger.info(f"Proxy on http://{host}:{port} -> workers on ports {[worker.port for worker in workers]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Streamlit workers behind a sticky-session proxy.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8501)))
+    parser.add_argument("--worker-base-port", type=int, default=8600)
+    parser.add_argument("--shared-cache-url", default=os.getenv("SHARED_CACHE_URL", "sqlite:///.shared_cache.sqlite3"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    # Every worker must sign and verify with the same keys; a random one is only good until the next start.
+    session_secret = os.getenv("SESSION_SECRET") or secrets.token_hex(32)
+    cookie_secret = os.getenv("STREAMLIT_SERVER_COOKIE_SECRET") or secrets.token_hex(32)
+    workers = [Worker(i, args.worker_base_port + i) for i in range(args.workers)]
+    for worker in workers:
+        worker.start(worker_env(worker.index, session_secret, args.shared_cache_url, cookie_secret))
+
+    deadline = time.time() + 60
+    while not all(worker.healthy() for worker in workers):
+        if time.time() > deadline or any(worker.process.poll() is not None for worker in workers):
+            logger.error("Workers failed to start.")
+            _stop(workers)
+            sys.exit(1)
+        time.sleep(0.5)
+
+    signal.signal(signal.SIGTERM, lambda *_: (_stop(workers), sys.exit(0)))
+    try:
+        asyncio.run(serve(workers, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _stop(workers)
+
+
+def _stop(workers: List[Worker]):
+    for worker in workers:
+        if worker.process and worker.process.poll() is None:
+            worker.process.terminate()
+    for worker in workers:
+        if worker.process:
+            worker.process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,54 @@
 import logging
+from typing import Tuple
 
 import streamlit as st
 
 from src.app.authentication import Authentication
 from src.app.chat import Chat
 from src.app.database import Database
+from src.app.debug_panel import DebugPanel
+from src.app.fragments import timed_section, versioned
+from src.app.session_memory import get_session_memory
 from src.definitions import constants as c
-from src.services.server import server
+from src.definitions.env_variables import EnvVariables
+from src.services.server import get_server
 from src.app.events import set_screen
+from src.utils.metrics import serve_metrics
+from src.utils.startup import startup_timer
 
 logger = logging.getLogger(__name__)
 
 
+@st.cache_resource(show_spinner=False)
+def _load_components() -> Tuple[Chat, Authentication, Database]:
+    # These hold no per-session state (everything lives in st.session_state), so one set per process is enough.
+    return Chat(), Authentication(), Database()
+
+
+@st.cache_resource(show_spinner=False)
+def _start_metrics_server(port: int):
+    # Once per process; Streamlit reruns the script on every interaction.
+    return serve_metrics(port)
+
+
 class ExpenseTrackerApp:
     def __init__(self):
-        self.server = server
-        self.chat = Chat()
-        self.authentication = Authentication()
-        self.db = Database()
+        self.server = get_server()
+        self.chat, self.authentication, self.db = _load_components()
+        self.session_memory = get_session_memory()
+        self.debug_panel = DebugPanel(self.session_memory) if EnvVariables.debug_panel() else None
+        if EnvVariables.metrics_port():
+            _start_metrics_server(EnvVariables.metrics_port())
+        startup_timer.mark("build components")
         self._initialize_app()
 
     @staticmethod
     def _initialize_app():
         st.set_page_config(page_title="Expense Tracker", layout="centered", initial_sidebar_state='collapsed')
 
-    @staticmethod
-    def _on_click_sign_out_button():
+    def _on_click_sign_out_button(self):
+        self.authentication.forget_session()
+        self.session_memory.release()
         set_screen(c.ENTRY_SCREEN)
         st.session_state.user = ""
         st.session_state.summary = ""
@@ -41,28 +64,53 @@ class ExpenseTrackerApp:
         # st.button(c.ADD_EXPENSES_BUTTON, on_click=set_screen, args=[c.EXPENSE_SCREEN])
         with st.sidebar:
             self.chat.chat_box()
+            if self.debug_panel:
+                self.debug_panel.render()
         self._dashboard()
 
     @staticmethod
     def _get_summary():
         if "summary" in st.session_state and st.session_state.summary:
             return st.session_state.summary
-        return "No data available for the current month."
+        return "No data available for the selected period."
 
     def _dashboard(self):
-        st.header(f"You spent Php {st.session_state.month_total} this month.")
-        st.write(self._get_summary())
-        if "plot" in st.session_state:
-            st.pyplot(st.session_state.plot)
+        self.db.reconcile_when_synced()
+        self.db.period_selector()
+        self._summary_section()
+        self._chart_section()
         st.header("Expenses")
-        add_expenses, view_all_expenses, _ = st.columns([2, 2, 4])
+        add_expenses, view_all_expenses, import_expenses, refresh, _ = st.columns([2, 2, 1, 1, 2])
         add_expenses.button(c.ADD_EXPENSES_BUTTON, use_container_width=True, on_click=set_screen, args=[c.EXPENSE_SCREEN])
         view_all_expenses.button("View All Expenses", use_container_width=True, on_click=set_screen, args=[c.HISTORY_SCREEN])
+        import_expenses.button(c.IMPORT_BUTTON, use_container_width=True, on_click=set_screen, args=[c.IMPORT_SCREEN])
+        refresh.button(c.REFRESH_BUTTON, use_container_width=True, on_click=self.db.on_refresh_monthly_data)
+        self.db.sync_status()
+        self._table_section()
+
+    @timed_section("summary")
+    def _summary_section(self):
+        st.header(f"You spent Php {st.session_state.month_total} in {st.session_state.get('period_label', 'this period')}.")
+        st.write(self._get_summary())
+
+    @timed_section("chart")
+    def _chart_section(self):
+        plot = self.db.current_plot()
+        if plot is not None:
+            self.db.plots.display(plot)
+
+    @timed_section("table")
+    def _table_section(self):
         if "monthly_data" in st.session_state and st.session_state.monthly_data is not None:
-            st.dataframe(st.session_state.monthly_data, hide_index=True, use_container_width=True)
+            # Converted to Arrow once per data version instead of on every rerun.
+            st.dataframe(versioned("table", self._monthly_table), hide_index=True, use_container_width=True)
         else:
             logger.info("Dashboard is up to date.")
 
+    @staticmethod
+    def _monthly_table():
+        return st.session_state.monthly_data.table()
+
     @staticmethod
     def _initialize_session_state():
         if "logged_in" not in st.session_state:
@@ -81,7 +129,10 @@ class ExpenseTrackerApp:
             st.session_state.month_total = 0
 
     def main(self):
+        self.session_memory.touch()
         self._initialize_session_state()
+        if not st.session_state.logged_in:
+            self.authentication.restore_session(self.db.on_refresh_monthly_data)
         if not st.session_state.logged_in:
             if st.session_state.screen == c.ENTRY_SCREEN:
                 self.authentication.entry_screen()
@@ -94,5 +145,9 @@ class ExpenseTrackerApp:
                 self.db.add_expenses_screen()
             elif st.session_state.screen == c.HISTORY_SCREEN:
                 self.db.expenses_history_screen()
+            elif st.session_state.screen == c.IMPORT_SCREEN:
+                self.db.import_expenses_screen()
             else:
                 self._home_screen()
+            self.authentication.renew_session()
+            self.session_memory.enforce()
@@ -1,18 +1,23 @@
+import time
 from typing import Callable, Tuple
 
 import streamlit as st
 
-from src.definitions.constants import LOGIN_BUTTON, LOGIN_SCREEN, REGISTER_BUTTON, REGISTER_SCREEN
+from src.definitions.constants import (
+    HOME_SCREEN, LOGIN_BUTTON, LOGIN_SCREEN, REGISTER_BUTTON, REGISTER_SCREEN, SESSION_TOKEN_PARAM
+)
 from src.definitions.messages import Messages
-from src.services.server import server
+from src.services.server import get_server
 from src.utils.decorators import authentication
+from src.utils.session_tokens import get_session_tokens
 from src.definitions.templates import UserTemplate
 from src.app.events import set_screen
 
 
 class Authentication:
     def __init__(self):
-        self.server = server
+        self.server = get_server()
+        self.tokens = get_session_tokens()
 
     """
     Server
@@ -61,6 +66,52 @@ class Authentication:
         col_1.button(LOGIN_BUTTON, on_click=self._on_click_button_from_entry, args=[LOGIN_SCREEN], use_container_width=True)
         col_2.button(REGISTER_BUTTON, on_click=self._on_click_button_from_entry, args=[REGISTER_SCREEN], use_container_width=True)
 
+    """
+    Session token
+    """
+    def restore_session(self, callback: Callable) -> bool:
+        # A refresh or reconnect starts a new session; a valid token in the URL logs it back in with no
+        # credential round trip, and the dashboard reload is served from the response cache.
+        token = st.query_params.get(SESSION_TOKEN_PARAM)
+        if not token:
+            return False
+        claims = self.tokens.verify(token)
+        if claims is None:
+            del st.query_params[SESSION_TOKEN_PARAM]
+            return False
+        st.session_state.logged_in = True
+        st.session_state.user = claims.username
+        st.session_state.name = claims.name
+        st.session_state.session_token = token
+        st.session_state.session_expires_at = claims.expires_at
+        st.session_state.screen = HOME_SCREEN
+        callback()
+        return True
+
+    def renew_session(self):
+        # Tokens are short-lived; an active session swaps its token for a fresh one once half the TTL has passed.
+        expires_at = st.session_state.get("session_expires_at")
+        if expires_at is None or expires_at - time.time() > self.tokens.ttl / 2:
+            return
+        self.tokens.revoke(st.session_state.get("session_token"))
+        self._start_session(st.session_state.user, st.session_state.name)
+
+    def forget_session(self):
+        # Revoked on the server, so the URL is useless even where it was bookmarked or shared.
+        token = st.session_state.get("session_token") or st.query_params.get(SESSION_TOKEN_PARAM)
+        if token:
+            self.tokens.revoke(token)
+        if SESSION_TOKEN_PARAM in st.query_params:
+            del st.query_params[SESSION_TOKEN_PARAM]
+        st.session_state.pop("session_token", None)
+        st.session_state.pop("session_expires_at", None)
+
+    def _start_session(self, username: str, name: str):
+        token = self.tokens.issue(username, name)
+        st.session_state.session_token = token
+        st.session_state.session_expires_at = time.time() + self.tokens.ttl
+        st.query_params[SESSION_TOKEN_PARAM] = token
+
     """ 
     Events
     """
@@ -68,10 +119,10 @@ class Authentication:
     def _on_click_button_from_entry(screen: str):
         st.session_state.screen = screen
 
-    @staticmethod
-    def _on_successful_login(name: str, username: str):
+    def _on_successful_login(self, name: str, username: str):
         st.session_state.user = username
         st.session_state.name = name if name != "" else username
+        self._start_session(username, st.session_state.name)
 
     def _on_click_auth_button(self, user: UserTemplate, screen: str, func: Callable, callback: Callable):
         if st.session_state.screen == screen:
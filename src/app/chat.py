@@ -1,31 +1,64 @@
+import threading
+from typing import Iterator, List
+
 import streamlit as st
 
-from src.services.server import server
+from src.app.chat_history import ChatHistory
+from src.app.fragments import dashboard_fragment
+from src.definitions.constants import STOP_BUTTON, SHOW_OLDER_MESSAGES_BUTTON
+from src.definitions.env_variables import EnvVariables
+from src.services.server import get_server
 
 
 class Chat:
 
     def __init__(self):
-        self.server = server
+        self.server = get_server()
 
+    @dashboard_fragment("chat")
     def chat_box(self):
+        # A fragment: sending a message reruns only the chat, not the dashboard beside it.
         messages = st.container(height=500)
 
         # Initialize Chat History
         if "messages" not in st.session_state:
-            st.session_state.messages = [
-                dict(role="assistant", content=f"Hello {st.session_state.name}! How can I help you today?")]
+            st.session_state.messages = ChatHistory(
+                capacity=EnvVariables.chat_history_capacity(),
+                window=EnvVariables.chat_history_window(),
+                summary_chars=EnvVariables.chat_summary_chars())
+            st.session_state.messages.append(
+                role="assistant", content=f"Hello {st.session_state.name}! How can I help you today?")
+        history: ChatHistory = st.session_state.messages
 
-        # Display chat messages from history on app rerun
-        for message in st.session_state.messages:
+        # Display only the most recent window of messages on app rerun
+        if history.hidden_count:
+            messages.button(f"{SHOW_OLDER_MESSAGES_BUTTON} ({history.hidden_count})", on_click=history.show_older)
+        for message in history.visible_messages():
             messages.chat_message(message["role"]).write(message["content"])
 
         if prompt := st.chat_input("Say something"):
             messages.chat_message("user").write(prompt)
-            user_message = dict(role="user", content=prompt)
-            st.session_state.messages.append(user_message)
-            bot_response = self.server.send_message_to_chatbot(user=st.session_state.user, message=prompt)
-            if bot_response:
-                messages.chat_message("assistant").write(bot_response)
-                bot_message = dict(role="assistant", content=bot_response)
-                st.session_state.messages.append(bot_message)
+            history.append(role="user", content=prompt)
+            self._stream_reply(messages, history, prompt)
+
+    def _stream_reply(self, messages, history: ChatHistory, prompt: str):
+        # Clicking Stop sets the event and reruns the script, which interrupts write_stream below.
+        cancel = threading.Event()
+        st.session_state.chat_cancel = cancel
+        st.button(STOP_BUTTON, on_click=cancel.set)
+        stream = self.server.stream_message_to_chatbot(
+            user=st.session_state.user, message=prompt, context=history.context(), cancel=cancel)
+        chunks: List[str] = []
+        try:
+            messages.chat_message("assistant").write_stream(self._collect(stream, chunks))
+        finally:
+            stream.close()
+            # Keep whatever arrived, even if the reply was cut short.
+            if chunks:
+                history.append(role="assistant", content="".join(chunks))
+
+    @staticmethod
+    def _collect(stream: Iterator[str], chunks: List[str]) -> Iterator[str]:
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
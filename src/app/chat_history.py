@@ -0,0 +1,54 @@
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List
+
+"""
+Fixed-size chat history. Only a recent window is rendered and evicted turns are folded into a short summary.
+"""
+
+
+class ChatHistory:
+    def __init__(self, capacity: int, window: int, summary_chars: int):
+        self.messages = deque(maxlen=capacity)
+        self.window = window
+        self.visible = window
+        self.summary_chars = summary_chars
+        self.summary = ""
+        self.conversation_id = uuid.uuid4().hex
+        self.user_turns = 0
+
+    def append(self, role: str, content: str):
+        if len(self.messages) == self.messages.maxlen:
+            self._fold(self.messages[0])
+        self.messages.append(dict(role=role, content=content))
+        if role == "user":
+            self.user_turns += 1
+
+    def visible_messages(self) -> List[Dict[str, str]]:
+        start = max(len(self.messages) - self.visible, 0)
+        return list(islice(self.messages, start, None))
+
+    @property
+    def hidden_count(self) -> int:
+        return max(len(self.messages) - self.visible, 0)
+
+    def show_older(self):
+        self.visible = min(self.visible + self.window, len(self.messages))
+
+    def shrink(self, keep: int):
+        # Frees memory by folding all but the last `keep` messages into the summary.
+        while len(self.messages) > keep:
+            self._fold(self.messages.popleft())
+
+    def size_in_bytes(self) -> int:
+        return sum(len(message["content"]) for message in self.messages) + len(self.summary)
+
+    def context(self) -> Dict[str, Any]:
+        # Sent instead of the transcript: the backend keys its own context on conversation_id. `turn` counts the
+        # user's messages so far, including the one being answered.
+        return dict(conversation_id=self.conversation_id, summary=self.summary, turn=self.user_turns)
+
+    def _fold(self, message: Dict[str, str]):
+        line = f"{message['role']}: {message['content'][:120]}"
+        self.summary = f"{self.summary}\n{line}".strip()[-self.summary_chars:]
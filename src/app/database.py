@@ -1,30 +1,55 @@
 import datetime
 import logging
-from datetime import timedelta, datetime as dt
-from typing import List, Dict, Union, Any
+import os
+import tempfile
+from datetime import datetime as dt
+from typing import List, Dict, Tuple, Union, Any
 
-import pandas as pd
 import streamlit as st
 
+from src.app.fragments import bump_data_version
 from src.app.plots import Plots
+from src.app.session_memory import MonthlyRows, compact_frame
 from src.definitions.constants import (
     STORE_BUTTON,
     HOME_SCREEN,
     EXIT_BUTTON,
+    IMPORT_BUTTON,
+    EXPORT_BUTTON,
+    DOWNLOAD_BUTTON,
     SHOW_EXPENSE_HISTORY_BUTTON,
+    BACK_TO_DASHBOARD_BUTTON,
+    PREVIOUS_PAGE_BUTTON,
+    NEXT_PAGE_BUTTON,
     CLEAR_DATABASE_CONTENTS,
-    AMOUNT)
-from src.definitions.enums import ExpenseCategory
-from src.services.server import server
-from src.utils.utils import validate_float_input, response_as_dataframe
+    RETRY_SYNC_BUTTON,
+    PREVIOUS_PERIOD_BUTTON,
+    NEXT_PERIOD_BUTTON,
+    AMOUNT,
+    CATEGORY,
+    DATE,
+    DESCRIPTION)
+from src.definitions.env_variables import EnvVariables
+from src.definitions.enums import ExpenseCategory, Period
+from src.definitions.templates import ExpenseFilter
+from src.services.async_server import get_async_server
+from src.services.server import get_server
+from src.services.write_behind import get_write_behind_queue, PENDING, FAILED
+from src.utils.periods import as_request_dates, period_bounds, period_label, shift_anchor, shift_custom_range
+from src.utils.utils import validate_float_input, response_as_dataframe, to_backend_timestamp, EXPENSE_CATEGORIES
 from src.app.events import set_screen
 
 logger = logging.getLogger(__name__)
 
+# Columns the dashboard shows; anything else is left on the server.
+DASHBOARD_FIELDS = tuple(column.lower() for column in (DATE, CATEGORY, DESCRIPTION, AMOUNT))
+
 
 class Database:
     def __init__(self):
-        self.server = server
+        self.server = get_server()
+        self.async_server = get_async_server()
+        self.journal = get_write_behind_queue()
         self.plots = Plots()
 
     """
@@ -42,10 +67,95 @@ class Database:
         store_bt, exit_bt = st.columns(2)
         store_bt.button(STORE_BUTTON, use_container_width=True, on_click=self._on_press_store_button, args=[selected_option, expense_description, amount, selected_date])
         exit_bt.button(EXIT_BUTTON, use_container_width=True, on_click=self._on_press_exit_button)
+        self.sync_status()
+
+    def sync_status(self):
+        counts = self.journal.counts(st.session_state.user)
+        if counts[PENDING]:
+            st.caption(f"Syncing {counts[PENDING]} expense(s) to the database...")
+        if counts[FAILED]:
+            message, retry = st.columns([4, 1])
+            message.warning(f"{counts[FAILED]} expense(s) failed to sync.")
+            retry.button(RETRY_SYNC_BUTTON, use_container_width=True, on_click=self.journal.retry_failed,
+                         args=[st.session_state.user])
+
+    def period_selector(self):
+        kind, previous_bt, label, next_bt = st.columns([2, 1, 3, 1])
+        periods = [period.value for period in Period]
+        kind.selectbox("Period", periods, index=periods.index(self._selected_period().value), key="period_kind_select",
+                       label_visibility="collapsed", on_change=self._on_change_period_kind)
+        previous_bt.button(PREVIOUS_PERIOD_BUTTON, use_container_width=True, on_click=self._on_shift_period, args=[-1])
+        label.markdown(f"**{st.session_state.get('period_label', '')}**")
+        next_bt.button(NEXT_PERIOD_BUTTON, use_container_width=True, on_click=self._on_shift_period, args=[1])
+        if self._selected_period() is Period.CUSTOM:
+            st.date_input("Date range", value=self._custom_range(), key="period_custom_range",
+                          on_change=self._on_change_custom_range)
+        with st.expander("Filters"):
+            st.multiselect("Categories", EXPENSE_CATEGORIES, default=st.session_state.get("filter_categories", []),
+                           key="filter_categories_select", on_change=self._on_change_filters)
+            min_amount, max_amount = st.columns(2)
+            min_amount.number_input("Min amount (Php)", value=st.session_state.get("filter_min_amount"), min_value=0.0,
+                                    key="filter_min_amount_input", on_change=self._on_change_filters)
+            max_amount.number_input("Max amount (Php)", value=st.session_state.get("filter_max_amount"), min_value=0.0,
+                                    key="filter_max_amount_input", on_change=self._on_change_filters)
+
+    def import_expenses_screen(self):
+        st.header("Import Expenses")
+        st.markdown("Upload a CSV with `category`, `description`, `amount` and `date` columns, "
+                    "or an OFX/QFX bank statement (debits only, imported as Miscellaneous).")
+        uploaded = st.file_uploader("Statement", type=["csv", "ofx", "qfx"])
+        import_bt, exit_bt = st.columns(2)
+        start_import = import_bt.button(IMPORT_BUTTON, use_container_width=True, disabled=uploaded is None)
+        exit_bt.button(EXIT_BUTTON, use_container_width=True, on_click=self._on_press_exit_button)
+        if start_import and uploaded is not None:
+            self._import_expenses(uploaded)
 
     def expenses_history_screen(self):
         st.header("Expenses History")
-        st.button("Back to dashboard", on_click=set_screen, args=[HOME_SCREEN])
+        st.button(BACK_TO_DASHBOARD_BUTTON, on_click=set_screen, args=[HOME_SCREEN])
+        page = st.session_state.get("history_page", 0)
+        rows, has_more = self._get_history_page(page)
+        if rows:
+            # Fixed height keeps the grid virtualized; only the current page is held in session state.
+            st.dataframe(response_as_dataframe(rows), hide_index=True, use_container_width=True, height=400)
+        else:
+            st.write("No expenses recorded yet.")
+        previous_bt, page_label, next_bt = st.columns([1, 3, 1])
+        previous_bt.button(PREVIOUS_PAGE_BUTTON, use_container_width=True, disabled=page == 0,
+                           on_click=self._on_change_history_page, args=[page - 1])
+        page_label.markdown(f"Page {page + 1}")
+        next_bt.button(NEXT_PAGE_BUTTON, use_container_width=True, disabled=not has_more,
+                       on_click=self._on_change_history_page, args=[page + 1])
+        self._export_history_section()
+
+    def _export_history_section(self):
+        from src.services.exporter import EXPORT_FORMATS, export_history
+
+        export_format, export_bt = st.columns([3, 1])
+        selected_format = export_format.selectbox("Export format", list(EXPORT_FORMATS), label_visibility="collapsed")
+        if not export_bt.button(EXPORT_BUTTON, use_container_width=True):
+            return
+        extension, mime = EXPORT_FORMATS[selected_format]
+        # Pages are streamed to a file on disk, so only one page is ever held as a DataFrame. Streamlit then reads
+        # the finished (compressed) file once to serve the download.
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f"expenses.{extension}")
+            try:
+                with st.spinner("Exporting..."):
+                    with open(path, "wb") as out:
+                        rows = export_history(self.server, st.session_state.user, selected_format, out,
+                                              page_size=EnvVariables.export_page_size())
+            except Exception as e:
+                # A failed page would otherwise leave a truncated file that looks complete.
+                logger.error(f"Failed to export expenses. Exception: {e}")
+                st.error("Something went wrong. Failed to export expenses; please try again.")
+                return
+            if rows == 0:
+                st.info("No expenses to export.")
+                return
+            with open(path, "rb") as exported:
+                st.download_button(f"{DOWNLOAD_BUTTON} ({rows} rows)", data=exported, mime=mime,
+                                   file_name=f"expenses-{st.session_state.user}.{extension}")
 
     """ 
     Events
@@ -54,17 +164,75 @@ class Database:
     def _on_press_exit_button():
         set_screen(HOME_SCREEN)
 
+    def _import_expenses(self, uploaded):
+        # pandas-heavy; only loaded when someone actually imports.
+        from src.services.importer import ExpenseImporter
+
+        importer = ExpenseImporter(
+            server=self.server,
+            chunk_size=EnvVariables.import_chunk_size(),
+            batch_size=EnvVariables.import_batch_size(),
+            concurrency=EnvVariables.import_concurrency())
+        file_type = uploaded.name.rsplit(".", 1)[-1].lower()
+        progress_bar = st.progress(0.0, text="Importing...")
+        total_bytes = max(uploaded.size, 1)
+
+        def on_progress(progress):
+            fraction = min(uploaded.tell() / total_bytes, 1.0)
+            progress_bar.progress(fraction, text=f"Read {progress.rows_read} rows. Stored {progress.stored}.")
+
+        try:
+            result = importer.run(uploaded, file_type, st.session_state.user, on_progress=on_progress)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        progress_bar.progress(1.0, text="Import complete.")
+        st.success(f"Imported {result.stored} of {result.rows_read} rows. "
+                   f"{result.invalid} invalid, {result.failed} failed to store.")
+        self.on_refresh_monthly_data()
+
     def _on_press_expense_history_button(self):
         if st.button(SHOW_EXPENSE_HISTORY_BUTTON, use_container_width=True):
-            payload = {
-                "username": st.session_state.user
-            }
-            data = self.server.get_historical_data(payload)
-            st.dataframe(response_as_dataframe(data))
+            rows, _ = self._get_history_page(0)
+            st.dataframe(response_as_dataframe(rows))
+
+    @staticmethod
+    def _on_change_history_page(page: int):
+        st.session_state.history_page = max(page, 0)
+
+    def _on_change_period_kind(self):
+        # Copied out of the widget key so the choice survives visits to other screens.
+        st.session_state.period_kind = st.session_state.period_kind_select
+        st.session_state.period_anchor = datetime.date.today()
+        self.on_refresh_monthly_data()
+
+    def _on_shift_period(self, steps: int):
+        period = self._selected_period()
+        if period is Period.CUSTOM:
+            st.session_state.custom_range = shift_custom_range(self._custom_range(), steps)
+            st.session_state.pop("period_custom_range", None)
+        else:
+            st.session_state.period_anchor = shift_anchor(period, self._period_anchor(), steps)
+        self.on_refresh_monthly_data()
+
+    def _on_change_filters(self):
+        st.session_state.filter_categories = st.session_state.filter_categories_select
+        st.session_state.filter_min_amount = st.session_state.filter_min_amount_input
+        st.session_state.filter_max_amount = st.session_state.filter_max_amount_input
+        self.on_refresh_monthly_data()
+
+    def _on_change_custom_range(self):
+        selected = st.session_state.period_custom_range
+        if len(selected) != 2:
+            # Only the first day has been picked so far.
+            return
+        st.session_state.custom_range = tuple(selected)
+        self.on_refresh_monthly_data()
 
     def _on_press_clear_database_button(self):
         if st.button(CLEAR_DATABASE_CONTENTS, use_container_width=True):
             self.server.clear_database_contents()
+            bump_data_version()
 
     def _on_press_store_button(self, selected_option: str, expense_description: str, amount: str,
                                selected_date: datetime.date):
@@ -79,8 +247,7 @@ class Database:
             valid_float_input=valid_float_input)
         try:
             if valid_homepage_inputs:
-                date = (datetime.datetime.combine(selected_date, datetime.time.min) + timedelta(
-                    days=1)).timestamp() * 1000  # Converts to datetime then gets timestamp
+                date = to_backend_timestamp(selected_date)
                 payload = {
                     "username": st.session_state.user,
                     "category": selected_option,
@@ -88,29 +255,74 @@ class Database:
                     "amount": amount,
                     "date": date
                 }
-                code = self.server.store_data_to_db(payload=payload)
+                # Journaled locally and acknowledged right away; the background worker posts it to the server.
+                self.journal.enqueue(payload)
                 st.session_state.refresh_dashboard = True
-                if code == 200:
-                    self.on_refresh_monthly_data()
-                    st.success("Expenses stored to database.")
-                else:
-                    st.error("Something went wrong. Failed to log expenses into database.")
-        except:
-            pass
+                self._on_expense_stored(selected_option, expense_description, float(amount), selected_date)
+                st.success("Expense saved. Syncing to database in the background.")
+        except Exception as e:
+            logger.error(f"Failed to store expense. Exception: {e}")
+            st.error("Something went wrong. Failed to log expenses into database.")
+
+    def _on_expense_stored(self, category: str, description: str, amount: float, selected_date: datetime.date):
+        # Apply the new row to what is already on screen instead of refetching the month.
+        # The chart is re-rendered from the updated rollup (O(days), not O(rows)).
+        # A full reconcile with the backend still happens every N writes or on Refresh.
+        st.session_state.history = None
+        st.session_state.writes_since_refresh = st.session_state.get("writes_since_refresh", 0) + 1
+        needs_reconcile = st.session_state.writes_since_refresh >= EnvVariables.reconcile_every_n_writes()
+        if needs_reconcile or st.session_state.get("monthly_data") is None or "rollup" not in st.session_state:
+            # enqueue() has already woken the worker. The refetch waits until it has delivered this user's entries
+            # (see reconcile_when_synced) rather than holding up the click while the backend is slow or down.
+            st.session_state.reconcile_pending = True
+        if st.session_state.get("monthly_data") is None or "rollup" not in st.session_state:
+            return
+        if not self._expense_filter().matches(dict(category=category, amount=amount), st.session_state.user):
+            # Stored, but outside the active filter: nothing on screen changes.
+            return
+        rollup = st.session_state.rollup
+        day_offset = rollup.add(selected_date, category, amount)
+        if day_offset is None:
+            return
+        row = {CATEGORY: category, DESCRIPTION: description, AMOUNT: amount, DATE: selected_date}
+        st.session_state.monthly_data.append(row)
+        st.session_state.month_total = rollup.total
+        st.session_state.plot = self.plots.render_monthly_expenses_bar_chart(rollup)
+        bump_data_version()
+
+    def reconcile_when_synced(self):
+        if st.session_state.get("reconcile_pending") and not self.journal.counts(st.session_state.user)[PENDING]:
+            st.session_state.reconcile_pending = False
+            self.on_refresh_monthly_data()
+
+    def current_plot(self):
+        # The chart may have been evicted from the session to stay within budget; the chart cache usually has it.
+        if "plot" not in st.session_state and st.session_state.get("monthly_data") is not None \
+                and "rollup" in st.session_state:
+            st.session_state.plot = self.plots.render_monthly_expenses_bar_chart(st.session_state.rollup)
+        return st.session_state.get("plot")
 
     def on_refresh_monthly_data(self):
         # TODO: Add validation if there's no data
         st.session_state.refresh_monthly_data = False
+        st.session_state.writes_since_refresh = 0
         st.session_state.monthly_data, start_date, end_date, summary = self._get_monthly_data()
+        st.session_state.period = (start_date, end_date)
+        st.session_state.period_label = period_label(self._selected_period(), start_date, end_date)
+        # numpy/pandas are only needed once a user reaches the dashboard.
+        from src.utils.rollups import ExpenseRollup
+        # Computed once from the raw data and shared by the header, the chart and incremental updates.
+        st.session_state.rollup = ExpenseRollup.from_dataframe(st.session_state.monthly_data, start_date, end_date)
+        st.session_state.month_total = st.session_state.rollup.total
         if st.session_state.monthly_data is not None:
-            st.session_state.plot = self.plots.plot_monthly_expenses_bar_chart(
-                st.session_state.monthly_data,
-                start_date=start_date,
-                end_date=end_date)
-            # Convert datetime to date here.
-            st.session_state.monthly_data["DATE"] = st.session_state.monthly_data["DATE"].dt.date
-            st.session_state.month_total = st.session_state.monthly_data[AMOUNT].sum()
+            st.session_state.plot = self.plots.render_monthly_expenses_bar_chart(st.session_state.rollup)
+            # Dates as plain days, and Arrow-backed columns to keep the session small.
+            st.session_state.monthly_data = MonthlyRows(compact_frame(st.session_state.monthly_data))
+        else:
+            # Nothing in this period: the previous period's chart must not stay on screen.
+            st.session_state.pop("plot", None)
         st.session_state.summary = summary
+        bump_data_version()
 
     """
     Helpers
@@ -137,12 +349,53 @@ class Database:
         selected_option = st.selectbox("CATEGORY", options)
         return selected_option
 
+    @staticmethod
+    def _selected_period() -> Period:
+        return Period(st.session_state.get("period_kind", Period.MONTH.value))
+
+    @staticmethod
+    def _period_anchor() -> datetime.date:
+        return st.session_state.get("period_anchor") or datetime.date.today()
+
+    @staticmethod
+    def _custom_range() -> Tuple[datetime.date, datetime.date]:
+        if st.session_state.get("custom_range"):
+            return st.session_state.custom_range
+        today = datetime.date.today()
+        return today.replace(day=1), today
+
+    @staticmethod
+    def _expense_filter() -> ExpenseFilter:
+        return ExpenseFilter(
+            categories=tuple(st.session_state.get("filter_categories") or ()),
+            min_amount=st.session_state.get("filter_min_amount"),
+            max_amount=st.session_state.get("filter_max_amount"),
+            fields=DASHBOARD_FIELDS)
+
+    def _period_bounds(self, steps: int = 0) -> Tuple[dt, dt]:
+        period = self._selected_period()
+        if period is Period.CUSTOM:
+            return period_bounds(period, self._period_anchor(), shift_custom_range(self._custom_range(), steps))
+        return period_bounds(period, shift_anchor(period, self._period_anchor(), steps))
+
     def _get_monthly_data(self):
-        date_fmt = "%m-%d-%Y"
-        start_date = dt(dt.now().year, dt.now().month, 1)
-        next_month = 1 if start_date.month == 12 else start_date.month + 1
-        end_date = dt(start_date.year, next_month, 1)
-        monthly_data, summary = self.server.get_monthly_data(start_date.strftime(date_fmt), end_date.strftime(date_fmt))
+        start_date, end_date = self._period_bounds()
+        request_start, request_end = as_request_dates(start_date, end_date)
+        expense_filter = self._expense_filter()
+        # Monthly data, history and the chat connection are independent, so fetch them together.
+        dashboard = self.async_server.run(self.async_server.fetch_dashboard(
+            user=st.session_state.user,
+            start_date=request_start,
+            end_date=request_end,
+            history_page_size=EnvVariables.history_page_size(),
+            expense_filter=expense_filter))
+        # Warm the cache for the neighbouring periods so Previous/Next answer without a round trip.
+        self.async_server.prefetch_monthly_data(
+            st.session_state.user, [as_request_dates(*self._period_bounds(steps)) for steps in (-1, 1)],
+            expense_filter=expense_filter)
+        st.session_state.history = dashboard.history
+        st.session_state.history_loaded_page = 0
+        monthly_data, summary = dashboard.monthly_data, dashboard.summary
         data_is_available = self._check_for_available_data(monthly_data, summary)
         if not data_is_available:
             logger.info(f"No data available for {start_date} to {end_date}")
@@ -150,10 +403,22 @@ class Database:
         df = response_as_dataframe(monthly_data)
         return df, start_date, end_date, summary
 
+    def _get_history_page(self, page: int) -> Tuple[List[Dict[str, Any]], bool]:
+        # Page 0 is prefetched with the dashboard. Other pages are fetched on demand and replace it.
+        if st.session_state.get("history") is not None and st.session_state.get("history_loaded_page", 0) == page:
+            return st.session_state.history
+        page_size = EnvVariables.history_page_size()
+        history = self.server.get_historical_page(st.session_state.user, offset=page * page_size, limit=page_size)
+        if history is None:
+            return [], False
+        st.session_state.history = history
+        st.session_state.history_loaded_page = page
+        return history
+
     @staticmethod
     def _check_for_available_data(monthly_data: Union[List[Dict[str, Any]], str], summary: str):
-        if isinstance(monthly_data, str):
+        if monthly_data is None or isinstance(monthly_data, str):
             return False
-        if summary == "":
+        if not summary:
             return False
         return True
@@ -0,0 +1,52 @@
+from typing import Any, Dict, List
+
+import streamlit as st
+
+from src.app.session_memory import SessionMemory
+from src.services.server import get_server
+from src.utils.metrics import metrics
+
+"""
+Admin/debug view of request metrics, hot-path spans and cache statistics. Enabled with DEBUG_PANEL.
+"""
+
+
+class DebugPanel:
+    def __init__(self, session_memory: SessionMemory):
+        self.server = get_server()
+        self.session_memory = session_memory
+
+    def render(self):
+        with st.expander("Debug"):
+            snapshot = metrics.snapshot()
+            st.markdown("**Endpoints**")
+            self._table(snapshot["endpoints"])
+            st.markdown("**Operations**")
+            self._table(snapshot["operations"])
+            st.markdown("**Spans**")
+            self._table(snapshot["spans"])
+            if snapshot["errors"]:
+                st.markdown("**Errors**")
+                self._table(snapshot["errors"])
+            st.markdown("**Session memory**")
+            footprint = self.session_memory.footprint()
+            st.caption(f"This session: {sum(footprint.values()):,} bytes of {self.session_memory.budget:,}")
+            self._table([dict(key=key, bytes=size) for key, size in sorted(footprint.items(), key=lambda item: -item[1])])
+            st.json(self.session_memory.stats(), expanded=False)
+            st.markdown("**Connections and caches**")
+            st.json(dict(
+                connections=self.server.connection_stats(),
+                response_cache=self.server.cache_stats(),
+                answer_cache=self.server.answer_cache_stats(),
+                chat_stream=self.server.chat_stream_stats(),
+                replica=self.server.replica_stats()), expanded=False)
+            st.download_button("Prometheus metrics", metrics.to_prometheus(), file_name="metrics.txt",
+                               mime="text/plain", use_container_width=True)
+
+    @staticmethod
+    def _table(rows: List[Dict[str, Any]]):
+        if not rows:
+            st.caption("Nothing recorded yet.")
+            return
+        st.dataframe([{key: str(value) if isinstance(value, dict) else value for key, value in row.items()}
+                      for row in rows], hide_index=True, use_container_width=True)
@@ -0,0 +1,57 @@
+from functools import wraps
+
+import streamlit as st
+
+from src.app.authentication import Authentication
+from src.app.session_memory import get_session_memory
+from src.utils.metrics import metrics
+
+"""
+Dashboard sections as Streamlit fragments. A widget inside a fragment reruns only that fragment, so typing in
+the chat no longer re-renders the header, chart and table. Sections without widgets of their own rerun with the
+page either way, so they are only timed, not wrapped. Each render is timed as a "render.<name>" span. A fragment
+rerun skips the main script, so the fragment keeps the session active and its token fresh itself.
+"""
+
+
+def timed_section(name: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.span(f"render.{name}"):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def dashboard_fragment(name: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if get_session_memory().touch():
+                # Released while idle: redraw the whole page, which is now signed out.
+                st.rerun()
+            Authentication().renew_session()
+            return func(*args, **kwargs)
+        return st.experimental_fragment(timed_section(name)(wrapper))
+    return decorator
+
+
+def data_version() -> int:
+    return st.session_state.get("data_version", 0)
+
+
+def bump_data_version():
+    # Called whenever the dashboard data changes (refresh, store, clear).
+    st.session_state.data_version = data_version() + 1
+
+
+def versioned(name: str, build):
+    # Rebuilds a section's derived view only when the data version moved since it was last built.
+    key = f"view_{name}"
+    cached = st.session_state.get(key)
+    if cached is not None and cached[0] == data_version():
+        return cached[1]
+    value = build()
+    st.session_state[key] = (data_version(), value)
+    return value
@@ -1,14 +1,93 @@
-from datetime import datetime as dt, timedelta
+import io
+import json
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import matplotlib.pyplot as plt
-import pandas as pd
 import streamlit as st
 
+from src.definitions.constants import MATPLOTLIB_BACKEND, VEGA_LITE_BACKEND
+from src.definitions.env_variables import EnvVariables
+from src.services.shared_cache import make_cache
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from src.utils.rollups import ExpenseRollup
+
+# Shared across sessions (and, with SHARED_CACHE_URL, across workers): identical aggregates render to identical charts.
+chart_cache = make_cache(
+    "charts",
+    max_entries=EnvVariables.chart_cache_max_entries(),
+    max_bytes=EnvVariables.chart_cache_max_bytes(),
+    ttl=EnvVariables.chart_cache_ttl())
+
+
+class ChartBackend:
+    name = ""
+
+    def render_monthly_expenses_bar_chart(self, rollup: "ExpenseRollup") -> Any:
+        key = (self.name, "monthly_expenses_bar_chart", rollup.fingerprint())
+        hit, chart = chart_cache.get(key)
+        if hit:
+            return chart
+        with metrics.span(f"chart.{self.name}"):
+            chart = self._monthly_expenses_bar_chart(rollup)
+        chart_cache.set(key, chart, size=self._size_of(chart))
+        return chart
+
+    def display(self, chart: Any):
+        raise NotImplementedError
+
+    def _monthly_expenses_bar_chart(self, rollup: "ExpenseRollup") -> Any:
+        raise NotImplementedError
+
+    @staticmethod
+    def _size_of(chart: Any) -> int:
+        raise NotImplementedError
+
+    @staticmethod
+    def _day_labels(rollup: "ExpenseRollup"):
+        import numpy as np
+
+        # 'YYYY-MM-DD' -> 'MM-DD'
+        return [label[5:] for label in np.datetime_as_string(rollup.days, unit='D')]
+
+
+class VegaLiteBackend(ChartBackend):
+    # Emits a Vega-Lite spec rendered client-side by Streamlit. No plotting library is loaded server-side.
+    name = VEGA_LITE_BACKEND
+
+    def display(self, chart: Dict[str, Any]):
+        st.vega_lite_chart(chart, use_container_width=True)
+
+    def _monthly_expenses_bar_chart(self, rollup: "ExpenseRollup") -> Dict[str, Any]:
+        values = [dict(date=label, amount=amount) for label, amount in zip(self._day_labels(rollup), rollup.daily.tolist())]
+        return {
+            "title": f"Expenses from {rollup.start_date.date()} to {rollup.end_date.date()}",
+            "height": 200,
+            "data": {"values": values},
+            "mark": {"type": "bar", "color": "springgreen", "opacity": 0.8},
+            "encoding": {
+                "x": {"field": "date", "type": "ordinal", "title": "Date", "sort": None},
+                "y": {"field": "amount", "type": "quantitative", "title": "Expenses (Php)"},
+                "tooltip": [
+                    {"field": "date", "type": "ordinal"},
+                    {"field": "amount", "type": "quantitative", "format": ",.2f"}]
+            }
+        }
+
+    @staticmethod
+    def _size_of(chart: Dict[str, Any]) -> int:
+        return len(json.dumps(chart))
+
+
+class MatplotlibBackend(ChartBackend):
+    # Renders PNG bytes. matplotlib is only imported when this backend is selected.
+    name = MATPLOTLIB_BACKEND
 
-class Plots:
     def __init__(self):
+        import matplotlib
+        matplotlib.use('Agg')
         # set theme here
-        plt.rcParams.update({
+        matplotlib.rcParams.update({
             'figure.facecolor': 'none',  # Transparent background
             'axes.facecolor': 'none',  # Transparent background for axes
             'savefig.facecolor': 'none',  # Transparent background for saved figures
@@ -25,27 +104,60 @@ class Plots:
             'font.sans-serif': ['Calibri'],  # Default font style (change 'Arial' to your preferred font)
         })
 
-    def plot_monthly_expenses_bar_chart(self, df: pd.DataFrame, start_date: dt, end_date: dt):
-        daily_sum = pd.DataFrame(index=pd.date_range(start_date, end_date - timedelta(days=1)))
-        df = df.set_index('DATE', drop=True)
-        sums = df.groupby(df.index.date)['AMOUNT'].sum()
-        daily_sum['AMOUNT'] = sums
-        daily_sum = daily_sum.fillna(0)
+    def display(self, chart: bytes):
+        st.image(chart, use_column_width=True)
+
+    def _monthly_expenses_bar_chart(self, rollup: "ExpenseRollup") -> bytes:
+        return self._to_png(self.plot_monthly_expenses_bar_chart(rollup))
 
-        # Create bar chart
-        fig, ax = plt.subplots(figsize=(7, 2))
-        ax.bar(daily_sum.index.strftime('%m-%d'), daily_sum['AMOUNT'], color='springgreen', alpha=0.8, edgecolor='black')
+    def plot_monthly_expenses_bar_chart(self, rollup: "ExpenseRollup"):
+        from matplotlib.figure import Figure
+
+        # Create bar chart. Figures are built without pyplot so no global figure state is kept per session.
+        fig = Figure(figsize=(7, 2))
+        ax = fig.subplots()
+        ax.bar(self._day_labels(rollup), rollup.daily, color='springgreen', alpha=0.8, edgecolor='black')
         ax.grid(axis='y', alpha=0.2)
         ax.set_xlabel('Date', fontsize=8)
         ax.set_ylabel('Expenses (Php)', fontsize=8)
-        ax.set_title(f'Expenses from {start_date.date()} to {end_date.date()}', fontsize=8)
-        plt.xticks(rotation=90, fontsize=6)
-        plt.yticks(fontsize=6)
+        ax.set_title(f'Expenses from {rollup.start_date.date()} to {rollup.end_date.date()}', fontsize=8)
+        ax.tick_params(axis='x', labelrotation=90, labelsize=6)
+        ax.tick_params(axis='y', labelsize=6)
         return fig
 
-    def plot_distribution(self, df: pd.DataFrame):
+    @staticmethod
+    def _to_png(fig) -> bytes:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+        fig.clear()
+        return buffer.getvalue()
+
+    @staticmethod
+    def _size_of(chart: bytes) -> int:
+        return len(chart)
+
+
+CHART_BACKENDS = {
+    VEGA_LITE_BACKEND: VegaLiteBackend,
+    MATPLOTLIB_BACKEND: MatplotlibBackend,
+}
+
+
+class Plots:
+    def __init__(self, backend: Optional[str] = None):
+        name = backend or EnvVariables.chart_backend()
+        if name not in CHART_BACKENDS:
+            raise ValueError(f"Unknown chart backend: {name}. Choose from {list(CHART_BACKENDS)}.")
+        self.backend: ChartBackend = CHART_BACKENDS[name]()
+
+    def render_monthly_expenses_bar_chart(self, rollup: "ExpenseRollup") -> Any:
+        return self.backend.render_monthly_expenses_bar_chart(rollup)
+
+    def display(self, chart: Any):
+        self.backend.display(chart)
+
+    def plot_distribution(self, rollup: "ExpenseRollup"):
         pass
 
     def plot_pie(self):
         pass
-
@@ -0,0 +1,267 @@
+import json
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src.app.chat_history import ChatHistory
+from src.definitions.constants import DATE, DESCRIPTION, ENTRY_SCREEN
+from src.definitions.env_variables import EnvVariables
+from src.utils.session_tokens import get_session_tokens
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+"""
+Per-session memory accounting for st.session_state. Heavy values are stored compactly, evicted in order of
+how cheap they are to rebuild once a session passes its byte budget, and dropped on sign-out or idle timeout.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Cheapest to rebuild first: derived views, the prefetched history page, the rendered chart, then old chat turns.
+EVICTION_ORDER = ("view_", "history", "plot", "messages")
+HEAVY_KEYS = ("monthly_data", "rollup", "plot", "history", "messages", "summary")
+
+
+@dataclass
+class SessionRecord:
+    state: Any
+    last_active: float
+    footprint: Dict[str, int] = field(default_factory=dict)
+    expired: bool = False
+
+
+class SessionMemory:
+    def __init__(self, budget: int, idle_timeout: float):
+        self.budget = budget
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, SessionRecord] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expired = 0
+        self._sweeper = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def touch(self) -> bool:
+        # Returns True when the sweeper marked this session idle and its state was released on this run.
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return False
+        # Weak reference: a session Streamlit has dropped must not be kept alive by this registry.
+        state = weakref.ref(_session_state(ctx))
+        with self._lock:
+            record = self._sessions.get(ctx.session_id)
+            expired = record is not None and record.expired
+            if record is None or expired:
+                self._sessions[ctx.session_id] = SessionRecord(state=state, last_active=time.time())
+            else:
+                record.state = state
+                record.last_active = time.time()
+        if expired:
+            self._expire(ctx.session_id)
+        return expired
+
+    def _expire(self, session_id: str):
+        # Runs on the session's own script thread, where st.session_state is safe to change.
+        for key in HEAVY_KEYS + ("session_token", "session_expires_at"):
+            st.session_state.pop(key, None)
+        st.session_state.logged_in = False
+        st.session_state.screen = ENTRY_SCREEN
+        self.expired += 1
+        logger.info(f"Released idle session {session_id[:8]}.")
+
+    def footprint(self) -> Dict[str, int]:
+        sizes = {}
+        for key in st.session_state:
+            size = _size_of(st.session_state[key])
+            if size:
+                sizes[str(key)] = size
+        return sizes
+
+    def enforce(self) -> Dict[str, int]:
+        sizes = self.footprint()
+        for prefix in EVICTION_ORDER:
+            if sum(sizes.values()) <= self.budget:
+                break
+            for key in [key for key in sizes if key.startswith(prefix)]:
+                sizes[key] = self._evict(key)
+        total = sum(sizes.values())
+        if total > self.budget:
+            logger.warning(f"Session is {total} bytes after eviction; budget is {self.budget}.")
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            with self._lock:
+                if ctx.session_id in self._sessions:
+                    self._sessions[ctx.session_id].footprint = sizes
+        return sizes
+
+    def _evict(self, key: str) -> int:
+        self.evictions += 1
+        value = st.session_state[key]
+        if isinstance(value, ChatHistory):
+            # Keep what is on screen; older turns survive only in the summary.
+            value.shrink(value.window)
+            return _size_of(value)
+        del st.session_state[key]
+        return 0
+
+    def release(self):
+        # Sign-out: nothing from this session should outlive it.
+        st.session_state.clear()
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            with self._lock:
+                self._sessions.pop(ctx.session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            sessions: List[Dict[str, Any]] = [
+                dict(session=session_id[:8], bytes=sum(record.footprint.values()),
+                     idle_seconds=round(now - record.last_active))
+                for session_id, record in self._sessions.items()]
+        return dict(
+            sessions=len(sessions),
+            total_bytes=sum(session["bytes"] for session in sessions),
+            budget_bytes=self.budget,
+            evictions=self.evictions,
+            expired=self.expired,
+            per_session=sorted(sessions, key=lambda session: -session["bytes"]))
+
+    def _run(self):
+        while True:
+            time.sleep(max(min(self.idle_timeout / 4, 60), 1))
+            try:
+                self._sweep()
+            except Exception as e:
+                logger.error(f"Session sweep failed. Exception: {e}")
+
+    def _sweep(self):
+        # The sweeper thread must not change a session's state while its script may be running, so it only
+        # revokes the token and marks the session; the session releases its own state on its next run.
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            for session_id, record in list(self._sessions.items()):
+                state = record.state()
+                if state is None:
+                    del self._sessions[session_id]
+                    continue
+                if record.expired or record.last_active >= cutoff:
+                    continue
+                record.expired = True
+                # Revoked now, or a refresh of the idle tab would log straight back in from the URL.
+                if "session_token" in state:
+                    get_session_tokens().revoke(state["session_token"])
+
+def _session_state(ctx) -> Any:
+    # ctx.session_state is a thread-safe wrapper rebuilt with every script run; the SessionState inside it lives as
+    # long as the browser session does, so that is what the sweeper has to hold on to.
+    return getattr(ctx.session_state, "_state", ctx.session_state)
+
+
+def compact_frame(df: "pd.DataFrame") -> "pd.DataFrame":
+    # Arrow-backed strings and dates instead of one Python object per cell.
+    import pandas as pd
+    import pyarrow as pa
+
+    if DATE in df.columns:
+        dates = df[DATE].dt.date if pd.api.types.is_datetime64_any_dtype(df[DATE].dtype) else df[DATE]
+        df[DATE] = dates.astype(pd.ArrowDtype(pa.date32()))
+    if DESCRIPTION in df.columns:
+        df[DESCRIPTION] = df[DESCRIPTION].astype("string[pyarrow]")
+    return df
+
+
+class MonthlyRows:
+    # The loaded period's rows plus those stored since. Appending is O(1): new rows wait in a list, and are folded into
+    # the DataFrame (one concat for all of them) or added to the Arrow table as a new chunk only when read.
+    def __init__(self, frame: "pd.DataFrame"):
+        self._frame = frame
+        self._rows: List[Dict[str, Any]] = []
+        self._in_frame = 0
+        self._table = None
+        self._in_table = 0
+
+    def __len__(self) -> int:
+        return len(self._frame) + len(self._rows) - self._in_frame
+
+    def append(self, row: Dict[str, Any]):
+        self._rows.append(row)
+
+    @property
+    def frame(self) -> "pd.DataFrame":
+        if self._in_frame < len(self._rows):
+            self._frame = append_rows(self._frame, self._rows[self._in_frame:])
+            self._in_frame = len(self._rows)
+        return self._frame
+
+    def table(self) -> "pa.Table":
+        import pyarrow as pa
+
+        if self._table is None:
+            self._table = pa.Table.from_pandas(self.frame, preserve_index=False)
+            self._in_table = self._in_frame
+        elif self._in_table < len(self._rows):
+            # Zero-copy: the existing chunks are reused and only the new rows are converted.
+            new_rows = append_rows(self._frame.iloc[:0].copy(), self._rows[self._in_table:])
+            self._table = pa.concat_tables([self._table, pa.Table.from_pandas(new_rows, preserve_index=False)])
+            self._in_table = len(self._rows)
+        return self._table
+
+    @property
+    def nbytes(self) -> int:
+        # The Arrow table is accounted for as the "table" view.
+        return int(self._frame.memory_usage(deep=True).sum()) + len(json.dumps(self._rows, default=str))
+
+
+def append_rows(df: "pd.DataFrame", rows: List[Dict[str, Any]]) -> "pd.DataFrame":
+    # Unlike df.loc[len(df)] = ..., keeps every column's dtype instead of falling back to object.
+    import pandas as pd
+
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            missing = list(dict.fromkeys(row.get(column) for row in rows if row.get(column) not in dtype.categories))
+            if missing:
+                df[column] = df[column].cat.add_categories(missing)
+    new_rows = pd.DataFrame([[row.get(column) for column in df.columns] for row in rows],
+                            columns=df.columns).astype(df.dtypes)
+    return pd.concat([df, new_rows], ignore_index=True)
+
+
+def _size_of(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, ChatHistory):
+        return value.size_in_bytes()
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], int):
+        # A versioned view: (data_version, value).
+        return _size_of(value[1])
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if hasattr(value, "daily") and hasattr(value, "by_category"):
+        return int(value.daily.nbytes + value.by_category.nbytes)
+    if isinstance(value, (dict, list, tuple)):
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+@lru_cache(maxsize=None)
+def get_session_memory() -> SessionMemory:
+    return SessionMemory(
+        budget=EnvVariables.session_memory_budget(),
+        idle_timeout=EnvVariables.session_idle_timeout())
@@ -2,12 +2,69 @@
 Env Keys
 """
 SERVER_BASE_URL = "SERVER_BASE_URL"
+HTTP_POOL_SIZE = "HTTP_POOL_SIZE"
+HTTP_MAX_RETRIES = "HTTP_MAX_RETRIES"
+HTTP_BACKOFF_FACTOR = "HTTP_BACKOFF_FACTOR"
+HTTP_CONNECT_TIMEOUT = "HTTP_CONNECT_TIMEOUT"
+HTTP_READ_TIMEOUT = "HTTP_READ_TIMEOUT"
+CHATBOT_READ_TIMEOUT = "CHATBOT_READ_TIMEOUT"
+RESPONSE_CACHE_MAX_ENTRIES = "RESPONSE_CACHE_MAX_ENTRIES"
+RESPONSE_CACHE_MAX_BYTES = "RESPONSE_CACHE_MAX_BYTES"
+RESPONSE_CACHE_TTL = "RESPONSE_CACHE_TTL"
+RECONCILE_EVERY_N_WRITES = "RECONCILE_EVERY_N_WRITES"
+HISTORY_PAGE_SIZE = "HISTORY_PAGE_SIZE"
+CHART_CACHE_MAX_ENTRIES = "CHART_CACHE_MAX_ENTRIES"
+CHART_CACHE_MAX_BYTES = "CHART_CACHE_MAX_BYTES"
+CHART_CACHE_TTL = "CHART_CACHE_TTL"
+CHART_BACKEND = "CHART_BACKEND"
+CHAT_HISTORY_CAPACITY = "CHAT_HISTORY_CAPACITY"
+CHAT_HISTORY_WINDOW = "CHAT_HISTORY_WINDOW"
+CHAT_SUMMARY_CHARS = "CHAT_SUMMARY_CHARS"
+ANSWER_CACHE_MAX_ENTRIES = "ANSWER_CACHE_MAX_ENTRIES"
+ANSWER_CACHE_MAX_BYTES = "ANSWER_CACHE_MAX_BYTES"
+ANSWER_CACHE_TTL = "ANSWER_CACHE_TTL"
+ANSWER_CACHE_SIMILARITY_THRESHOLD = "ANSWER_CACHE_SIMILARITY_THRESHOLD"
+EXPENSE_JOURNAL_PATH = "EXPENSE_JOURNAL_PATH"
+WRITE_BEHIND_BATCH_SIZE = "WRITE_BEHIND_BATCH_SIZE"
+WRITE_BEHIND_MAX_ATTEMPTS = "WRITE_BEHIND_MAX_ATTEMPTS"
+WRITE_BEHIND_FLUSH_INTERVAL = "WRITE_BEHIND_FLUSH_INTERVAL"
+WRITE_BEHIND_BACKOFF = "WRITE_BEHIND_BACKOFF"
+IMPORT_CHUNK_SIZE = "IMPORT_CHUNK_SIZE"
+IMPORT_BATCH_SIZE = "IMPORT_BATCH_SIZE"
+IMPORT_CONCURRENCY = "IMPORT_CONCURRENCY"
+EXPORT_PAGE_SIZE = "EXPORT_PAGE_SIZE"
+LOCAL_REPLICA_PATH = "LOCAL_REPLICA_PATH"
+LOCAL_REPLICA_MAX_AGE = "LOCAL_REPLICA_MAX_AGE"
+LOCAL_REPLICA_PAGE_SIZE = "LOCAL_REPLICA_PAGE_SIZE"
+DEBUG_PANEL = "DEBUG_PANEL"
+METRICS_PORT = "METRICS_PORT"
+SESSION_MEMORY_BUDGET = "SESSION_MEMORY_BUDGET"
+SESSION_IDLE_TIMEOUT = "SESSION_IDLE_TIMEOUT"
+SESSION_SECRET = "SESSION_SECRET"
+SESSION_TOKEN_TTL = "SESSION_TOKEN_TTL"
+SHARED_CACHE_URL = "SHARED_CACHE_URL"
 
 """ 
 Dataframe Columns
 """
 DATE = "DATE"
 AMOUNT = "AMOUNT"
+CATEGORY = "CATEGORY"
+DESCRIPTION = "DESCRIPTION"
+USER = "USER"
+DATE_FORMAT = "ISO8601"
+
+""" 
+Chart Backends
+"""
+VEGA_LITE_BACKEND = "vega-lite"
+MATPLOTLIB_BACKEND = "matplotlib"
+
+""" 
+Export Formats
+"""
+PARQUET_FORMAT = "Parquet"
+CSV_FORMAT = "CSV"
 
 """ 
 Screens
@@ -18,6 +75,12 @@ EXPENSE_SCREEN = 'expense_form'
 HOME_SCREEN = 'home'
 ENTRY_SCREEN = 'entry'
 HISTORY_SCREEN = 'expenses_history'
+IMPORT_SCREEN = 'import_expenses'
+
+""" 
+Query Parameters
+"""
+SESSION_TOKEN_PARAM = "session"
 
 """ 
 Buttons
@@ -29,3 +92,15 @@ SHOW_EXPENSE_HISTORY_BUTTON = "Show Expense History"
 CLEAR_DATABASE_CONTENTS = "Clear database contents"
 EXIT_BUTTON = "Exit"
 ADD_EXPENSES_BUTTON = "Add Expenses"
+REFRESH_BUTTON = "Refresh"
+PREVIOUS_PAGE_BUTTON = "Previous"
+NEXT_PAGE_BUTTON = "Next"
+PREVIOUS_PERIOD_BUTTON = "◀"
+NEXT_PERIOD_BUTTON = "▶"
+BACK_TO_DASHBOARD_BUTTON = "Back to dashboard"
+STOP_BUTTON = "Stop"
+SHOW_OLDER_MESSAGES_BUTTON = "Show older messages"
+RETRY_SYNC_BUTTON = "Retry failed"
+IMPORT_BUTTON = "Import"
+EXPORT_BUTTON = "Export"
+DOWNLOAD_BUTTON = "Download"
@@ -7,4 +7,11 @@ class ExpenseCategory(Enum):
     EDUCATION = "Education"
     UTILITIES = "Utilities"
     MISC = "Miscellaneous"
-    
\ No newline at end of file
+    
+
+class Period(Enum):
+    MONTH = "Month"
+    WEEK = "Week"
+    QUARTER = "Quarter"
+    YEAR = "Year"
+    CUSTOM = "Custom"
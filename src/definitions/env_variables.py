@@ -1,7 +1,50 @@
 import os
 from dotenv import load_dotenv
 
-from src.definitions.constants import SERVER_BASE_URL
+from src.definitions.constants import (
+    SERVER_BASE_URL,
+    HTTP_POOL_SIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    CHATBOT_READ_TIMEOUT,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_TTL,
+    RECONCILE_EVERY_N_WRITES,
+    HISTORY_PAGE_SIZE,
+    CHART_CACHE_MAX_ENTRIES,
+    CHART_CACHE_MAX_BYTES,
+    CHART_CACHE_TTL,
+    CHART_BACKEND,
+    CHAT_HISTORY_CAPACITY,
+    CHAT_HISTORY_WINDOW,
+    CHAT_SUMMARY_CHARS,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_MAX_BYTES,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    EXPENSE_JOURNAL_PATH,
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_MAX_ATTEMPTS,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    WRITE_BEHIND_BACKOFF,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_BATCH_SIZE,
+    IMPORT_CONCURRENCY,
+    EXPORT_PAGE_SIZE,
+    LOCAL_REPLICA_PATH,
+    LOCAL_REPLICA_MAX_AGE,
+    LOCAL_REPLICA_PAGE_SIZE,
+    DEBUG_PANEL,
+    METRICS_PORT,
+    SESSION_MEMORY_BUDGET,
+    SESSION_IDLE_TIMEOUT,
+    SESSION_SECRET,
+    SESSION_TOKEN_TTL,
+    SHARED_CACHE_URL,
+    VEGA_LITE_BACKEND)
 
 load_dotenv()
 
@@ -11,3 +54,171 @@ class EnvVariables:
     @classmethod
     def server_base_url(cls) -> str:
         return os.getenv(SERVER_BASE_URL, "http://localhost:3000")
+
+    @classmethod
+    def http_pool_size(cls) -> int:
+        return int(os.getenv(HTTP_POOL_SIZE, 10))
+
+    @classmethod
+    def http_max_retries(cls) -> int:
+        return int(os.getenv(HTTP_MAX_RETRIES, 3))
+
+    @classmethod
+    def http_backoff_factor(cls) -> float:
+        return float(os.getenv(HTTP_BACKOFF_FACTOR, 0.3))
+
+    @classmethod
+    def http_connect_timeout(cls) -> float:
+        return float(os.getenv(HTTP_CONNECT_TIMEOUT, 3.05))
+
+    @classmethod
+    def http_read_timeout(cls) -> float:
+        return float(os.getenv(HTTP_READ_TIMEOUT, 15))
+
+    @classmethod
+    def chatbot_read_timeout(cls) -> float:
+        return float(os.getenv(CHATBOT_READ_TIMEOUT, 60))
+
+    @classmethod
+    def response_cache_max_entries(cls) -> int:
+        return int(os.getenv(RESPONSE_CACHE_MAX_ENTRIES, 512))
+
+    @classmethod
+    def response_cache_max_bytes(cls) -> int:
+        return int(os.getenv(RESPONSE_CACHE_MAX_BYTES, 64 * 1024 * 1024))
+
+    @classmethod
+    def response_cache_ttl(cls) -> float:
+        return float(os.getenv(RESPONSE_CACHE_TTL, 300))
+
+    @classmethod
+    def reconcile_every_n_writes(cls) -> int:
+        return int(os.getenv(RECONCILE_EVERY_N_WRITES, 10))
+
+    @classmethod
+    def history_page_size(cls) -> int:
+        return int(os.getenv(HISTORY_PAGE_SIZE, 100))
+
+    @classmethod
+    def chart_cache_max_entries(cls) -> int:
+        return int(os.getenv(CHART_CACHE_MAX_ENTRIES, 256))
+
+    @classmethod
+    def chart_cache_max_bytes(cls) -> int:
+        return int(os.getenv(CHART_CACHE_MAX_BYTES, 32 * 1024 * 1024))
+
+    @classmethod
+    def chart_cache_ttl(cls) -> float:
+        return float(os.getenv(CHART_CACHE_TTL, 3600))
+
+    @classmethod
+    def chart_backend(cls) -> str:
+        return os.getenv(CHART_BACKEND, VEGA_LITE_BACKEND).lower()
+
+    @classmethod
+    def chat_history_capacity(cls) -> int:
+        return int(os.getenv(CHAT_HISTORY_CAPACITY, 50))
+
+    @classmethod
+    def chat_history_window(cls) -> int:
+        return int(os.getenv(CHAT_HISTORY_WINDOW, 10))
+
+    @classmethod
+    def chat_summary_chars(cls) -> int:
+        return int(os.getenv(CHAT_SUMMARY_CHARS, 1000))
+
+    @classmethod
+    def answer_cache_max_entries(cls) -> int:
+        return int(os.getenv(ANSWER_CACHE_MAX_ENTRIES, 1024))
+
+    @classmethod
+    def answer_cache_max_bytes(cls) -> int:
+        return int(os.getenv(ANSWER_CACHE_MAX_BYTES, 8 * 1024 * 1024))
+
+    @classmethod
+    def answer_cache_ttl(cls) -> float:
+        return float(os.getenv(ANSWER_CACHE_TTL, 3600))
+
+    @classmethod
+    def answer_cache_similarity_threshold(cls) -> float:
+        return float(os.getenv(ANSWER_CACHE_SIMILARITY_THRESHOLD, 0))
+
+    @classmethod
+    def expense_journal_path(cls) -> str:
+        return os.getenv(EXPENSE_JOURNAL_PATH, ".expense_journal.sqlite3")
+
+    @classmethod
+    def write_behind_batch_size(cls) -> int:
+        return int(os.getenv(WRITE_BEHIND_BATCH_SIZE, 50))
+
+    @classmethod
+    def write_behind_max_attempts(cls) -> int:
+        return int(os.getenv(WRITE_BEHIND_MAX_ATTEMPTS, 5))
+
+    @classmethod
+    def write_behind_flush_interval(cls) -> float:
+        return float(os.getenv(WRITE_BEHIND_FLUSH_INTERVAL, 2))
+
+    @classmethod
+    def write_behind_backoff(cls) -> float:
+        return float(os.getenv(WRITE_BEHIND_BACKOFF, 2))
+
+    @classmethod
+    def import_chunk_size(cls) -> int:
+        return int(os.getenv(IMPORT_CHUNK_SIZE, 5000))
+
+    @classmethod
+    def import_batch_size(cls) -> int:
+        return int(os.getenv(IMPORT_BATCH_SIZE, 500))
+
+    @classmethod
+    def import_concurrency(cls) -> int:
+        return int(os.getenv(IMPORT_CONCURRENCY, 4))
+
+    @classmethod
+    def export_page_size(cls) -> int:
+        return int(os.getenv(EXPORT_PAGE_SIZE, 5000))
+
+    @classmethod
+    def local_replica_path(cls) -> str:
+        # Empty disables the replica.
+        return os.getenv(LOCAL_REPLICA_PATH, "")
+
+    @classmethod
+    def local_replica_max_age(cls) -> float:
+        return float(os.getenv(LOCAL_REPLICA_MAX_AGE, 300))
+
+    @classmethod
+    def local_replica_page_size(cls) -> int:
+        return int(os.getenv(LOCAL_REPLICA_PAGE_SIZE, 5000))
+
+    @classmethod
+    def debug_panel(cls) -> bool:
+        return os.getenv(DEBUG_PANEL, "false").lower() in ("1", "true", "yes")
+
+    @classmethod
+    def metrics_port(cls) -> int:
+        # 0 disables the /metrics endpoint.
+        return int(os.getenv(METRICS_PORT, 0))
+
+    @classmethod
+    def session_memory_budget(cls) -> int:
+        return int(os.getenv(SESSION_MEMORY_BUDGET, 16 * 1024 * 1024))
+
+    @classmethod
+    def session_idle_timeout(cls) -> float:
+        return float(os.getenv(SESSION_IDLE_TIMEOUT, 1800))
+
+    @classmethod
+    def session_secret(cls) -> str:
+        # Empty means a random key per process.
+        return os.getenv(SESSION_SECRET, "")
+
+    @classmethod
+    def session_token_ttl(cls) -> float:
+        return float(os.getenv(SESSION_TOKEN_TTL, 3600))
+
+    @classmethod
+    def shared_cache_url(cls) -> str:
+        # Empty keeps the response and chart caches in-process.
+        return os.getenv(SHARED_CACHE_URL, "")
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 
 @dataclass
@@ -6,3 +7,50 @@ class UserTemplate:
     name: str
     username: str
     password: str
+
+
+@dataclass
+class DashboardTemplate:
+    monthly_data: Union[List[Dict[str, Any]], str, None]
+    summary: Optional[str]
+    history: Optional[Tuple[List[Dict[str, Any]], bool]]
+
+
+@dataclass(frozen=True)
+class ExpenseFilter:
+    # Hashable so it can be part of a cache key.
+    categories: Tuple[str, ...] = ()
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    fields: Tuple[str, ...] = ()
+
+    def as_payload(self) -> Dict[str, Any]:
+        payload = {}
+        if self.categories:
+            payload["categories"] = list(self.categories)
+        if self.min_amount is not None:
+            payload["min_amount"] = self.min_amount
+        if self.max_amount is not None:
+            payload["max_amount"] = self.max_amount
+        if self.fields:
+            payload["fields"] = list(self.fields)
+        return payload
+
+    def matches(self, row: Dict[str, Any], user: str) -> bool:
+        # Same checks on the client, for backends (or replicas) that ignore some of the pushed-down parameters.
+        if user and row.get("user") not in (None, user):
+            return False
+        if self.categories and row.get("category") not in self.categories:
+            return False
+        amount = float(row.get("amount") or 0)
+        if self.min_amount is not None and amount < self.min_amount:
+            return False
+        return self.max_amount is None or amount <= self.max_amount
+
+    def project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.fields:
+            return row
+        return {key: value for key, value in row.items() if key in self.fields}
+
+    def apply(self, rows: List[Dict[str, Any]], user: str) -> List[Dict[str, Any]]:
+        return [self.project(row) for row in rows if self.matches(row, user)]
@@ -14,6 +14,9 @@ class Urls:
     def store_data_endpoint(self) -> str:
         return f'{self.db_url}/store'
 
+    def store_batch_endpoint(self) -> str:
+        return f'{self.db_url}/store-batch'
+
     def expense_history_endpoint(self) -> str:
         return f'{self.db_url}/history'
 
@@ -29,3 +32,6 @@ class Urls:
     def chatbot_message_endpoint(self) -> str:
         return f'{self.chatbot_url}/send-message'
 
+    def chatbot_stream_endpoint(self) -> str:
+        return f'{self.chatbot_url}/stream-message'
+
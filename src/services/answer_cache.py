@@ -0,0 +1,131 @@
+import datetime
+import math
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.services.cache import ResponseCache
+
+"""
+Per-user cache of chatbot answers, matched on normalized prompts and optionally by similarity. Only the opening
+question of a conversation is cached, and only for the day it was asked: the backend resolves follow-ups ("and last
+month?") against the earlier turns, and relative dates ("this month") against today.
+"""
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_VECTOR_DIMENSIONS = 1024
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, similarity_threshold: float):
+        self.cache = ResponseCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        # (user, scope, normalized prompt) -> embedding, least recently set first.
+        self._vectors: "OrderedDict[Tuple[str, Tuple[str, ...], str], Counter]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        return " ".join(_TOKEN_PATTERN.findall(prompt.lower()))
+
+    @staticmethod
+    def scope(context: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str, ...]]:
+        # None for a follow-up (see ChatHistory.context): its answer depends on turns the key cannot capture.
+        context = context or {}
+        if context.get("summary") or int(context.get("turn") or 1) > 1:
+            return None
+        return (datetime.date.today().isoformat(),)
+
+    def get(self, user: str, prompt: str, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        scope = self.scope(context)
+        if scope is None:
+            return None
+        normalized = self.normalize(prompt)
+        hit, answer = self.cache.get((user, scope, normalized))
+        if hit:
+            self._count("exact_hits")
+            return answer
+        if self.similarity_threshold > 0:
+            match = self._most_similar(user, scope, normalized)
+            if match is not None:
+                hit, answer = self.cache.get((user, scope, match))
+                if hit:
+                    self._count("similar_hits")
+                    return answer
+        self._count("misses")
+        return None
+
+    def set(self, user: str, prompt: str, answer: str, context: Optional[Dict[str, Any]] = None):
+        scope = self.scope(context)
+        if scope is None:
+            return
+        normalized = self.normalize(prompt)
+        self.cache.set((user, scope, normalized), answer, size=len(answer.encode()), owner=user)
+        if self.similarity_threshold > 0:
+            with self._lock:
+                key = (user, scope, normalized)
+                self._vectors[key] = _embed(normalized)
+                self._vectors.move_to_end(key)
+                while len(self._vectors) > self.max_entries:
+                    self._vectors.popitem(last=False)
+
+    def invalidate_user(self, user: str):
+        self.cache.invalidate_owner(user)
+        with self._lock:
+            for key in [key for key in self._vectors if key[0] == user]:
+                del self._vectors[key]
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self._vectors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            stats = dict(
+                exact_hits=self.exact_hits,
+                similar_hits=self.similar_hits,
+                misses=self.misses,
+                hit_rate=hits / lookups if lookups else 0.0)
+        cache_stats = self.cache.stats()
+        stats.update(entries=cache_stats["entries"], bytes=cache_stats["bytes"])
+        return stats
+
+    def _most_similar(self, user: str, scope: Tuple[str, ...], normalized: str) -> Optional[str]:
+        query = _embed(normalized)
+        best, best_score = None, self.similarity_threshold
+        with self._lock:
+            for (owner, candidate_scope, candidate), vector in self._vectors.items():
+                if owner != user or candidate_scope != scope:
+                    continue
+                score = _cosine(query, vector)
+                if score >= best_score:
+                    best, best_score = candidate, score
+        return best
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def _embed(normalized: str) -> Counter:
+    # Hashed bag of words and bigrams: a cheap local embedding with no model download.
+    tokens = normalized.split()
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return Counter(zlib.crc32(feature.encode()) % _VECTOR_DIMENSIONS for feature in features)
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[key] for key, count in a.items() if key in b)
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm
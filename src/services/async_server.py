@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, List, Optional, Tuple, TypeVar
+
+from src.definitions.templates import DashboardTemplate, ExpenseFilter
+from src.services.server import Server, get_server
+
+"""
+Asyncio counterpart to Server. Calls run on a dedicated executor over the same pooled session,
+so concurrent requests reuse keep-alive connections instead of opening new ones.
+"""
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_END_OF_STREAM = object()
+
+
+class AsyncServer:
+    def __init__(self, sync_server: Server):
+        self.server = sync_server
+        self.executor = ThreadPoolExecutor(
+            max_workers=sync_server.http.pool_size,
+            thread_name_prefix="async-server")
+
+    async def _call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def store_data_to_db(self, payload: Dict[str, Any]) -> int:
+        return await self._call(self.server.store_data_to_db, payload)
+
+    async def store_batch_to_db(self, username: str, payloads: List[Dict[str, Any]]) -> int:
+        return await self._call(self.server.store_batch_to_db, username, payloads)
+
+    async def store_expenses(self, username: str, payloads: List[Dict[str, Any]]) -> List[Optional[int]]:
+        return await self._call(self.server.store_expenses, username, payloads)
+
+    async def get_monthly_data(self, start_date, end_date, user: str = "",
+                               expense_filter: Optional[ExpenseFilter] = None) -> Tuple[List[Dict[str, Any]], str]:
+        return await self._call(self.server.get_monthly_data, start_date, end_date, user=user,
+                                expense_filter=expense_filter)
+
+    async def get_historical_data(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self._call(self.server.get_historical_data, payload)
+
+    async def get_historical_page(self, username: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        return await self._call(self.server.get_historical_page, username, offset=offset, limit=limit)
+
+    async def clear_database_contents(self) -> int:
+        return await self._call(self.server.clear_database_contents)
+
+    async def register_user(self, name: str, username: str, password: str) -> Tuple[bool, str]:
+        return await self._call(self.server.register_user, name=name, username=username, password=password)
+
+    async def login_user(self, username: str, password: str) -> Tuple[bool, str]:
+        return await self._call(self.server.login_user, username=username, password=password)
+
+    async def send_message_to_chatbot(self, user: str, message: str,
+                                      context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        return await self._call(self.server.send_message_to_chatbot, user=user, message=message, context=context)
+
+    async def stream_message_to_chatbot(self, user: str, message: str,
+                                        context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        # Each token is read on the executor, so the loop stays free between them. Leaving the loop early or
+        # cancelling the task sets the stream's cancel event, which drops the connection.
+        cancel = threading.Event()
+        tokens = self.server.stream_message_to_chatbot(user, message, context=context, cancel=cancel)
+        pending = None
+        try:
+            while True:
+                pending = self.executor.submit(next, tokens, _END_OF_STREAM)
+                token = await asyncio.wrap_future(pending)
+                if token is _END_OF_STREAM:
+                    return
+                yield token
+        finally:
+            cancel.set()
+            if pending is not None and not pending.done():
+                # A read is still in flight on the executor; the generator can only be closed once it returns.
+                pending.add_done_callback(lambda _: tokens.close())
+            else:
+                tokens.close()
+
+    async def warm_up_chatbot(self) -> int:
+        return await self._call(self.server.warm_up_chatbot)
+
+    async def fetch_dashboard(self, user: str, start_date: str, end_date: str, history_page_size: int,
+                              expense_filter: Optional[ExpenseFilter] = None) -> DashboardTemplate:
+        # Independent requests go out together; latency is that of the slowest one.
+        monthly, history, _ = await asyncio.gather(
+            self.get_monthly_data(start_date, end_date, user=user, expense_filter=expense_filter),
+            self.get_historical_page(user, offset=0, limit=history_page_size),
+            self.warm_up_chatbot(),
+            return_exceptions=True)
+        monthly_data, summary = self._unpack_monthly(monthly)
+        if isinstance(history, BaseException):
+            logger.error(f"Failed to fetch expense history. Exception: {history}")
+            history = None
+        return DashboardTemplate(monthly_data=monthly_data, summary=summary, history=history)
+
+    def prefetch_monthly_data(self, user: str, ranges: List[Tuple[str, str]],
+                              expense_filter: Optional[ExpenseFilter] = None):
+        # Fire and forget: the responses land in the server's cache for the next navigation.
+        for start_date, end_date in ranges:
+            self.executor.submit(self.server.get_monthly_data, start_date, end_date, user=user,
+                                 expense_filter=expense_filter)
+
+    @staticmethod
+    def _unpack_monthly(monthly: Any) -> Tuple[Any, Optional[str]]:
+        if isinstance(monthly, BaseException):
+            logger.error(f"Failed to fetch monthly data. Exception: {monthly}")
+            return None, None
+        if monthly is None:
+            return None, None
+        return monthly
+
+    @staticmethod
+    def run(coroutine: Coroutine[Any, Any, T]) -> T:
+        # Streamlit script threads have no running loop, so each call gets a short-lived one.
+        return asyncio.run(coroutine)
+
+
+@lru_cache(maxsize=None)
+def get_async_server() -> AsyncServer:
+    return AsyncServer(get_server())
@@ -0,0 +1,71 @@
+import argparse
+import logging
+from typing import IO, Optional
+
+from src.definitions.constants import PARQUET_FORMAT, CSV_FORMAT
+from src.definitions.env_variables import EnvVariables
+from src.services.server import Server, get_server
+from src.utils.utils import response_as_dataframe
+
+"""
+Streams a user's expense history page by page into Parquet or CSV.
+Only one page is ever held as a DataFrame; output goes straight to the target file.
+"""
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    PARQUET_FORMAT: ("parquet", "application/vnd.apache.parquet"),
+    CSV_FORMAT: ("csv", "text/csv"),
+}
+
+
+def export_history(server: Server, username: str, export_format: str, out: IO[bytes],
+                   page_size: Optional[int] = None) -> int:
+    if export_format == PARQUET_FORMAT:
+        return _export_parquet(server, username, out, page_size)
+    if export_format == CSV_FORMAT:
+        return _export_csv(server, username, out, page_size)
+    raise ValueError(f"Unknown export format: {export_format}. Choose from {list(EXPORT_FORMATS)}.")
+
+
+def _export_parquet(server: Server, username: str, out: IO[bytes], page_size: Optional[int]) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for page in server.iter_historical_data(username, page_size=page_size, use_cache=False):
+            table = pa.Table.from_pandas(response_as_dataframe(page, assume_sorted=True), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema, compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _export_csv(server: Server, username: str, out: IO[bytes], page_size: Optional[int]) -> int:
+    rows = 0
+    for page in server.iter_historical_data(username, page_size=page_size, use_cache=False):
+        df = response_as_dataframe(page, assume_sorted=True)
+        chunk = df.to_csv(index=False, header=rows == 0, date_format="%Y-%m-%dT%H:%M:%S.%fZ")
+        out.write(chunk.encode("utf-8"))
+        rows += len(df)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a user's expense history.")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default=PARQUET_FORMAT)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--page-size", type=int, default=EnvVariables.export_page_size())
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    with open(args.out, "wb") as f:
+        exported = export_history(get_server(), args.user, args.format, f, page_size=args.page_size)
+    logger.info(f"Exported {exported} rows to {args.out}")
@@ -0,0 +1,161 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from src.definitions.enums import ExpenseCategory
+from src.services.server import Server
+from src.utils.utils import EXPENSE_CATEGORIES, to_backend_timestamp
+
+"""
+Bulk import of expenses from CSV or OFX/QFX bank statements.
+Files are read in chunks, validated column-wise and posted in bounded-concurrency batches.
+"""
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = ["category", "description", "amount", "date"]
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+_OFX_FIELD = re.compile(r"<(TRNTYPE|DTPOSTED|TRNAMT|NAME|MEMO)>([^<\r\n]*)", re.I)
+# A trailing UTC offset after a time of day, e.g. "2025-12-01 23:30:00-05:00" or "...T23:30Z".
+_UTC_OFFSET = r"(\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?:Z|UTC|[+-]\d{2}:?\d{2})$"
+
+
+@dataclass
+class ImportProgress:
+    rows_read: int = 0
+    stored: int = 0
+    invalid: int = 0
+    failed: int = 0
+
+
+def iter_csv_chunks(file: IO, chunk_size: int) -> Iterator[pd.DataFrame]:
+    for chunk in pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False, skipinitialspace=True):
+        chunk.columns = [column.strip().lower() for column in chunk.columns]
+        missing = set(CSV_COLUMNS).difference(chunk.columns)
+        if missing:
+            raise ValueError(f"CSV is missing columns: {sorted(missing)}")
+        yield chunk[CSV_COLUMNS]
+
+
+def iter_ofx_chunks(file: IO, chunk_size: int, read_size: int = 1 << 16) -> Iterator[pd.DataFrame]:
+    # Bank statements carry no category; imported transactions are filed under Miscellaneous. Only money going
+    # out is an expense: credits (salary, refunds, deposits) are skipped.
+    rows: List[Dict[str, str]] = []
+    credits = 0
+    buffer = ""
+    while True:
+        data = file.read(read_size)
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", errors="replace")
+        buffer += data
+        end = 0
+        for match in _OFX_TRANSACTION.finditer(buffer):
+            end = match.end()
+            row = _ofx_row(match.group(1))
+            if row is None:
+                credits += 1
+                continue
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield pd.DataFrame(rows, columns=CSV_COLUMNS)
+                rows = []
+        buffer = buffer[end:]
+        if not data:
+            break
+    if rows:
+        yield pd.DataFrame(rows, columns=CSV_COLUMNS)
+    if credits:
+        logger.info(f"Skipped {credits} credit transaction(s) in the statement.")
+
+
+def _ofx_row(transaction: str) -> Optional[Dict[str, str]]:
+    # None for a credit. Debits carry a negative TRNAMT; some banks send them positive with TRNTYPE DEBIT.
+    fields = {key.upper(): value.strip() for key, value in _OFX_FIELD.findall(transaction)}
+    amount = fields.get("TRNAMT", "")
+    if not amount.startswith("-") and fields.get("TRNTYPE", "").upper() != "DEBIT":
+        return None
+    amount = amount.lstrip("-+")
+    return dict(
+        category=ExpenseCategory.MISC.value,
+        description=fields.get("NAME") or fields.get("MEMO", ""),
+        amount=amount,
+        date=fields.get("DTPOSTED", "")[:8])
+
+
+def validate_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    # Same rules as the add-expense form, applied to the whole chunk at once.
+    amounts = pd.to_numeric(chunk["amount"], errors="coerce")
+    dates = _parse_dates(chunk["date"])
+    valid_option = chunk["category"].isin(EXPENSE_CATEGORIES)
+    valid_fields = (chunk["description"] != "") | (chunk["amount"] != "")
+    valid_float_input = amounts.notna()
+    valid = valid_option & valid_fields & valid_float_input & dates.notna()
+    return chunk.assign(amount=amounts, date=dates.dt.date)[valid]
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    # The calendar day as written. Offsets are dropped rather than converted: converting to UTC would move late
+    # evening expenses to the next day, and mixed offsets would leave pandas without a single datetime dtype.
+    local = values.str.strip().str.replace(_UTC_OFFSET, r"\1", regex=True, case=False)
+    try:
+        dates = pd.to_datetime(local, errors="coerce", format="mixed")
+    except (ValueError, TypeError, OverflowError):
+        dates = None
+    if dates is None or not pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        # Still not one datetime column: the chunk's dates are counted as invalid rather than failing the import.
+        logger.info("Could not parse the dates in an import chunk.")
+        return pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    return dates
+
+
+def to_payloads(valid: pd.DataFrame, username: str) -> List[Dict[str, Any]]:
+    # Statements repeat dates heavily, so convert each distinct date once.
+    timestamps = {date: to_backend_timestamp(date) for date in valid["date"].unique()}
+    return [
+        dict(username=username, category=category, description=description, amount=str(amount),
+             date=timestamps[date])
+        for category, description, amount, date in zip(
+            valid["category"], valid["description"], valid["amount"], valid["date"])]
+
+
+class ExpenseImporter:
+    def __init__(self, server: Server, chunk_size: int, batch_size: int, concurrency: int):
+        self.server = server
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def run(self, file: IO, file_type: str, username: str,
+            on_progress: Optional[Callable[[ImportProgress], None]] = None) -> ImportProgress:
+        chunks = iter_ofx_chunks(file, self.chunk_size) if file_type in ("ofx", "qfx") \
+            else iter_csv_chunks(file, self.chunk_size)
+        progress = ImportProgress()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="importer") as executor:
+            for chunk in chunks:
+                valid = validate_chunk(chunk)
+                progress.rows_read += len(chunk)
+                progress.invalid += len(chunk) - len(valid)
+                payloads = to_payloads(valid, username)
+                batches = [payloads[i:i + self.batch_size] for i in range(0, len(payloads), self.batch_size)]
+                for stored, failed in executor.map(lambda batch: self._store(username, batch), batches):
+                    progress.stored += stored
+                    progress.failed += failed
+                if on_progress is not None:
+                    on_progress(progress)
+        return progress
+
+    def _store(self, username: str, batch: List[Dict[str, Any]]):
+        try:
+            return self._store_batch(username, batch)
+        except Exception as e:
+            logger.error(f"Failed to import batch of {len(batch)} expenses. Exception: {e}")
+            return 0, len(batch)
+
+    def _store_batch(self, username: str, batch: List[Dict[str, Any]]):
+        codes = self.server.store_expenses(username, batch)
+        stored = sum(code == 200 for code in codes)
+        return stored, len(batch) - stored
@@ -0,0 +1,317 @@
+import datetime
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.utils.periods import REQUEST_DATE_FORMAT
+
+if TYPE_CHECKING:
+    from src.definitions.templates import ExpenseFilter
+    from src.services.server import Server
+
+"""
+Optional local read replica of expense history. Rows are mirrored into SQLite, indexed on (user, date) and
+(user, category), and refreshed in the background so date-range and category reads skip the round trip.
+"""
+
+logger = logging.getLogger(__name__)
+
+LOCAL_SUMMARY_LABEL = "Summary from your locally synced expenses:"
+
+# Incremental syncs only see new rows; a full walk this often also picks up edits and deletes made elsewhere.
+FULL_SYNC_INTERVAL = 24 * 60 * 60
+
+
+class LocalReplica:
+    def __init__(self, server: "Server", path: str, max_age: float, page_size: int):
+        self.server = server
+        self.path = path
+        self.max_age = max_age
+        self.page_size = page_size
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.Lock()
+        self._syncing = set()
+        self._sync_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replica-sync")
+        self.local_reads = 0
+        self.syncs = 0
+        self.incremental_syncs = 0
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS expenses (
+                    user TEXT NOT NULL,
+                    row_key TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    date_ms REAL,
+                    category TEXT,
+                    amount REAL,
+                    row TEXT NOT NULL,
+                    generation INTEGER NOT NULL,
+                    PRIMARY KEY (user, row_key))""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS expenses_user_date ON expenses (user, date_ms)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS expenses_user_category ON expenses (user, category, date_ms)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS expenses_user_seq ON expenses (user, seq)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    user TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL,
+                    synced_at REAL NOT NULL,
+                    stale_at REAL NOT NULL DEFAULT 0)""")
+            # Replica files written before incremental sync lack these; the next sync is then a full walk.
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sync_state)")}
+            if "cursor" not in columns:
+                self._conn.execute("ALTER TABLE sync_state ADD COLUMN cursor TEXT")
+            if "full_synced_at" not in columns:
+                self._conn.execute("ALTER TABLE sync_state ADD COLUMN full_synced_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS summaries (
+                    user TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (user, period))""")
+
+    def is_fresh(self, user: str) -> bool:
+        # Fresh means synced and untouched since. Past max_age it is still served, but refreshed in the background.
+        with self._db_lock:
+            state = self._conn.execute("SELECT synced_at, stale_at FROM sync_state WHERE user = ?", (user,)).fetchone()
+        if state is None or state[1] >= state[0]:
+            return False
+        if time.time() - state[0] > self.max_age:
+            self.schedule_sync(user)
+        return True
+
+    def mark_stale(self, user: str):
+        with self._db_lock:
+            self._conn.execute("UPDATE sync_state SET stale_at = ? WHERE user = ?", (time.time(), user))
+
+    def clear(self):
+        with self._db_lock:
+            self._conn.execute("DELETE FROM expenses")
+            self._conn.execute("DELETE FROM sync_state")
+            self._conn.execute("DELETE FROM summaries")
+
+    def remember_summary(self, user: str, start_date: str, end_date: str, expense_filter: "ExpenseFilter",
+                         summary: str):
+        # The backend's own summary, reused for this period while the user's data is unchanged.
+        if not user or not summary:
+            return
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (user, period, summary, stored_at) VALUES (?, ?, ?, ?)",
+                (user, _period_key(start_date, end_date, expense_filter), summary, time.time()))
+
+    def summary(self, user: str, start_date: str, end_date: str, expense_filter: "ExpenseFilter") -> Optional[str]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT summaries.summary FROM summaries JOIN sync_state USING (user) "
+                "WHERE user = ? AND period = ? AND summaries.stored_at > sync_state.stale_at",
+                (user, _period_key(start_date, end_date, expense_filter))).fetchone()
+        return row[0] if row else None
+
+    def schedule_sync(self, user: str):
+        with self._sync_lock:
+            if not user or user in self._syncing:
+                return
+            self._syncing.add(user)
+        self._executor.submit(self._sync_in_background, user)
+
+    def _sync_in_background(self, user: str):
+        try:
+            self.sync(user)
+        except Exception as e:
+            logger.error(f"Failed to sync local replica for {user}. Exception: {e}")
+        finally:
+            with self._sync_lock:
+                self._syncing.discard(user)
+
+    def sync(self, user: str) -> int:
+        # Picks up where the last sync stopped when the backend pages by id (see _sync_after); otherwise, and once
+        # every FULL_SYNC_INTERVAL, walks the whole history.
+        with self._db_lock:
+            state = self._conn.execute(
+                "SELECT generation, cursor, full_synced_at FROM sync_state WHERE user = ?", (user,)).fetchone()
+        if state and state[1] and time.time() - state[2] < FULL_SYNC_INTERVAL:
+            synced = self._sync_after(user, generation=state[0], cursor=state[1])
+            if synced is not None:
+                return synced
+        return self._full_sync(user, generation=(state[0] if state else 0) + 1)
+
+    def _sync_after(self, user: str, generation: int, cursor: str) -> Optional[int]:
+        # Rows created after the last one seen, upserted by id. None when the backend ignored `after` (its first page
+        # holds rows we already have, or rows without ids), in which case the caller falls back to a full walk.
+        started = time.time()
+        with self._db_lock:
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM expenses WHERE user = ?",
+                                     (user,)).fetchone()[0]
+        offset = 0
+        latest = cursor
+        has_more = True
+        while has_more:
+            page = self.server.get_historical_page(user, offset=offset, limit=self.page_size, use_cache=False,
+                                                   after=cursor)
+            if page is None:
+                raise RuntimeError("history page request failed")
+            rows, has_more = page
+            ids = [_row_id(row) for row in rows]
+            if any(row_id is None or _id_order(row_id) <= _id_order(cursor) for row_id in ids):
+                return None
+            records = []
+            for row in rows:
+                records.append(_as_record(user, row, seq, generation, Counter()))
+                seq += 1
+            latest = max(ids + [latest], key=_id_order)
+            offset += len(rows)
+            with self._db_lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO expenses (user, row_key, seq, date_ms, category, amount, row, generation) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", records)
+        with self._db_lock:
+            self._conn.execute("UPDATE sync_state SET cursor = ?, synced_at = ? WHERE user = ?",
+                               (latest, started, user))
+        self.syncs += 1
+        self.incremental_syncs += 1
+        logger.info(f"Synced {offset} new expenses for {user} into the local replica in {time.time() - started:.2f}s")
+        return offset
+
+    def _full_sync(self, user: str, generation: int) -> int:
+        # Rows are upserted under a new generation and anything the backend no longer returns is swept at the end.
+        started = time.time()
+        seen = Counter()
+        seq = 0
+        # The newest id seen, or None once any row comes without one: then there is nothing to resume from.
+        latest: Optional[str] = ""
+        has_more = True
+        while has_more:
+            page = self.server.get_historical_page(user, offset=seq, limit=self.page_size, use_cache=False)
+            if page is None:
+                # Leave the previous generation in place rather than sweeping on a partial read.
+                raise RuntimeError("history page request failed")
+            rows, has_more = page
+            records = []
+            for row in rows:
+                records.append(_as_record(user, row, seq, generation, seen))
+                seq += 1
+                row_id = _row_id(row)
+                if latest is not None:
+                    latest = None if row_id is None else max(latest, row_id, key=_id_order)
+            with self._db_lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO expenses (user, row_key, seq, date_ms, category, amount, row, generation) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", records)
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM expenses WHERE user = ? AND generation != ?", (user, generation))
+            # synced_at is when paging started, so a write that lands mid-sync still leaves the user stale.
+            self._conn.execute(
+                "INSERT INTO sync_state (user, generation, synced_at, cursor, full_synced_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (user) DO UPDATE SET generation = excluded.generation, synced_at = excluded.synced_at, "
+                "cursor = excluded.cursor, full_synced_at = excluded.full_synced_at",
+                (user, generation, started, latest or None, started))
+            self._conn.execute("COMMIT")
+        self.syncs += 1
+        logger.info(f"Synced {seq} expenses for {user} into the local replica in {time.time() - started:.2f}s")
+        return seq
+
+    def query(self, user: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+              categories: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        clauses, params = ["user = ?"], [user]
+        if start_date:
+            clauses.append("date_ms >= ?")
+            params.append(_request_date_ms(start_date))
+        if end_date:
+            clauses.append("date_ms < ?")
+            params.append(_request_date_ms(end_date))
+        if categories:
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        sql = f"SELECT row FROM expenses WHERE {' AND '.join(clauses)} ORDER BY date_ms, seq"
+        with self._db_lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        self.local_reads += 1
+        return [json.loads(row) for row, in rows]
+
+    def page(self, user: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        with self._db_lock:
+            # By date like the history endpoint; rows added by an incremental sync carry later seqs.
+            rows = self._conn.execute(
+                "SELECT row FROM expenses WHERE user = ? ORDER BY date_ms, seq LIMIT ? OFFSET ?",
+                (user, limit + 1, offset)).fetchall()
+        self.local_reads += 1
+        data = [json.loads(row) for row, in rows]
+        return data[:limit], len(data) > limit
+
+    def stats(self) -> Dict[str, Any]:
+        with self._db_lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+            users = self._conn.execute("SELECT COUNT(*) FROM sync_state").fetchone()[0]
+        return dict(rows=rows, users=users, syncs=self.syncs, incremental_syncs=self.incremental_syncs,
+                    local_reads=self.local_reads)
+
+
+def summarize(rows: Iterable[Dict[str, Any]]) -> str:
+    # Stand-in for the backend's summary when a month is answered locally and no current one is stored. Labelled,
+    # so it is not mistaken for the backend's wording.
+    totals = Counter()
+    count = 0
+    for row in rows:
+        totals[row.get("category")] += float(row.get("amount") or 0)
+        count += 1
+    if not count:
+        return ""
+    total = sum(totals.values())
+    top, top_amount = totals.most_common(1)[0]
+    return (f"{LOCAL_SUMMARY_LABEL} {count} expenses totalling {total:,.2f} this period. "
+            f"Most was spent on {top} ({top_amount:,.2f}).")
+
+
+def _row_id(row: Dict[str, Any]) -> Optional[str]:
+    row_id = row.get("_id") or row.get("id")
+    return None if row_id is None else str(row_id)
+
+
+def _id_order(row_id: str) -> Tuple[int, str]:
+    # Backend ids grow with insertion: numeric ids, or Mongo ObjectIds (fixed-length hex, timestamp first).
+    return len(row_id), row_id
+
+
+def _period_key(start_date: str, end_date: str, expense_filter: "ExpenseFilter") -> str:
+    return json.dumps([start_date, end_date, expense_filter.as_payload()], sort_keys=True)
+
+
+def _as_record(user: str, row: Dict[str, Any], seq: int, generation: int, seen: Counter) -> Tuple:
+    raw = json.dumps(row, sort_keys=True)
+    row_key = _row_id(row)
+    if row_key is None:
+        # No backend id: key on content plus its occurrence count so identical expenses are kept apart.
+        digest = hashlib.sha1(raw.encode()).hexdigest()
+        seen[digest] += 1
+        row_key = f"{digest}:{seen[digest]}"
+    return (user, str(row_key), seq, _row_date_ms(row.get("date")), row.get("category"),
+            float(row.get("amount") or 0), raw, generation)
+
+
+def _row_date_ms(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp() * 1000
+
+
+def _request_date_ms(value: str) -> float:
+    # Request dates are local calendar days, the same convention to_backend_timestamp uses for stored dates.
+    return datetime.datetime.strptime(value, REQUEST_DATE_FORMAT).timestamp() * 1000
@@ -1,11 +1,21 @@
 import json
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 import requests
 
+from src.definitions.env_variables import EnvVariables
+from src.definitions.templates import ExpenseFilter
 from src.definitions.urls import Urls
+from src.services.answer_cache import AnswerCache
+from src.services.replica import LocalReplica, summarize
+from src.services.session import HttpSession
+from src.services.shared_cache import make_cache
+from src.services.streaming import StreamMetrics, StreamTimer, iter_response_tokens
 from src.utils.decorators import on_http_error
+from src.utils.metrics import redact
 
 """
 Communicates with node server
@@ -17,6 +27,34 @@ logger = logging.getLogger(__name__)
 class Server:
     def __init__(self):
         self.urls = Urls()
+        self.http = HttpSession()
+        self.http.set_timeout(
+            self.urls.chatbot_message_endpoint(),
+            connect=EnvVariables.http_connect_timeout(),
+            read=EnvVariables.chatbot_read_timeout())
+        self.http.set_timeout(
+            self.urls.chatbot_stream_endpoint(),
+            connect=EnvVariables.http_connect_timeout(),
+            read=EnvVariables.chatbot_read_timeout())
+        self.stream_metrics = StreamMetrics()
+        self.answer_cache = AnswerCache(
+            max_entries=EnvVariables.answer_cache_max_entries(),
+            max_bytes=EnvVariables.answer_cache_max_bytes(),
+            ttl=EnvVariables.answer_cache_ttl(),
+            similarity_threshold=EnvVariables.answer_cache_similarity_threshold())
+        self.cache = make_cache(
+            "responses",
+            max_entries=EnvVariables.response_cache_max_entries(),
+            max_bytes=EnvVariables.response_cache_max_bytes(),
+            ttl=EnvVariables.response_cache_ttl())
+        self.batch_store_supported = True
+        # Whether the history endpoint honours offset/limit; probed on the first request past page one.
+        self.history_paging_supported: Optional[bool] = None
+        replica_path = EnvVariables.local_replica_path()
+        self.replica = LocalReplica(
+            self, path=replica_path,
+            max_age=EnvVariables.local_replica_max_age(),
+            page_size=EnvVariables.local_replica_page_size()) if replica_path else None
 
     @staticmethod
     def _get_key_from_json_response(response: requests.Response, key: str) -> Any:
@@ -26,42 +64,205 @@ class Server:
             return ""
         return json_dict.get(key)
 
+    def connection_stats(self) -> Dict[str, int]:
+        return self.http.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+    def chat_stream_stats(self) -> Dict[str, Any]:
+        return self.stream_metrics.stats()
+
+    def replica_stats(self) -> Optional[Dict[str, Any]]:
+        return self.replica.stats() if self.replica else None
+
+    def _replica_for(self, user: str) -> Optional[LocalReplica]:
+        # The replica answers only once it holds a complete, untouched copy of the user's history.
+        if self.replica is None or not user:
+            return None
+        if self.replica.is_fresh(user):
+            return self.replica
+        self.replica.schedule_sync(user)
+        return None
+
+    def _invalidate_user(self, user: str):
+        self.cache.invalidate_owner(user)
+        self.answer_cache.invalidate_user(user)
+        if self.replica:
+            self.replica.mark_stale(user)
+
+    def answer_cache_stats(self) -> Dict[str, Any]:
+        stats = self.answer_cache.stats()
+        durations = list(self.stream_metrics.durations)
+        average_reply = sum(durations) / len(durations) if durations else 0.0
+        stats["estimated_seconds_saved"] = (stats["exact_hits"] + stats["similar_hits"]) * average_reply
+        return stats
+
     @on_http_error
     def store_data_to_db(self, payload: Dict[str, Any]) -> int:
         endpoint = self.urls.store_data_endpoint()
-        logger.info(f"Storing expense data. Endpoint: {endpoint}, Payload: {payload}")
-        response = requests.post(endpoint, json=payload)
+        logger.info(f"Storing expense data. Endpoint: {endpoint}, Payload: {redact(payload)}")
+        response = self.http.post(endpoint, json=payload)
+        if response.status_code == 200:
+            self._invalidate_user(payload.get("username", ""))
         return response.status_code
 
     @on_http_error
-    def get_monthly_data(self, start_date, end_date) -> Tuple[List[Dict[str, Any]], str]:
-        payload = dict(start_date=start_date, end_date=end_date)
+    def store_batch_to_db(self, username: str, payloads: List[Dict[str, Any]]) -> int:
+        endpoint = self.urls.store_batch_endpoint()
+        logger.info(f"Storing {len(payloads)} expenses. Endpoint: {endpoint}")
+        response = self.http.post(endpoint, json=dict(username=username, expenses=payloads))
+        if response.status_code == 200:
+            self._invalidate_user(username)
+        return response.status_code
+
+    def store_expenses(self, username: str, payloads: List[Dict[str, Any]]) -> List[Optional[int]]:
+        # One bulk request per call where the backend has the route. If it answers 404/405, that is remembered and
+        # every later call falls back to one POST per row over the pooled session. Returns a status per payload.
+        if self.batch_store_supported:
+            code = self.store_batch_to_db(username, payloads)
+            if code not in (404, 405):
+                return [code] * len(payloads)
+            logger.info("Bulk store endpoint unavailable. Falling back to per-row stores.")
+            self.batch_store_supported = False
+        return [self.store_data_to_db(payload=payload) for payload in payloads]
+
+    @on_http_error
+    def get_monthly_data(self, start_date, end_date, user: str = "",
+                         expense_filter: Optional[ExpenseFilter] = None) -> Tuple[List[Dict[str, Any]], str]:
+        # Scoped to one user, with filters and projection pushed down so the payload only carries what is shown.
+        expense_filter = expense_filter or ExpenseFilter()
+        payload = dict(start_date=start_date, end_date=end_date, **expense_filter.as_payload())
+        if user:
+            payload["username"] = user
         endpoint = self.urls.monthly_data_endpoint()
-        logger.info(f"Getting expense data from {start_date} to {end_date}. Endpoint: {endpoint}. Payload: {payload}")
-        response = requests.get(endpoint, json=payload)
+        cache_key = (endpoint, user, start_date, end_date, expense_filter)
+        hit, cached = self.cache.get(cache_key)
+        if hit:
+            logger.info(f"Serving expense data from {start_date} to {end_date} from cache.")
+            return cached
+        replica = self._replica_for(user)
+        if replica:
+            rows = [row for row in replica.query(user, start_date, end_date, expense_filter.categories)
+                    if expense_filter.matches(row, user)]
+            summary = replica.summary(user, start_date, end_date, expense_filter) or summarize(rows)
+            return [expense_filter.project(row) for row in rows], summary
+        logger.info(f"Getting expense data from {start_date} to {end_date}. Endpoint: {endpoint}. Payload: {redact(payload)}")
+        response = self.http.get(endpoint, json=payload)
         data = self._get_key_from_json_response(response, key='data')
         summary = self._get_key_from_json_response(response, key='summary')
+        if isinstance(data, list):
+            data = expense_filter.apply(data, user)
+        if response.status_code == 200:
+            self.cache.set(cache_key, (data, summary), size=len(response.content), owner=user)
+            if self.replica:
+                self.replica.remember_summary(user, start_date, end_date, expense_filter, summary)
         return data, summary
 
     @on_http_error
     def get_historical_data(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         endpoint = self.urls.expense_history_endpoint()
-        response = requests.get(endpoint, json=payload)
-        logger.info(f"Getting expense data. Endpoint: {endpoint}. Payload: {payload}")
-        return self._get_key_from_json_response(response, key='data')
+        user = payload.get("username", "")
+        cache_key = (endpoint, user, None, None)
+        hit, cached = self.cache.get(cache_key)
+        if hit:
+            logger.info(f"Serving expense history for {user} from cache.")
+            return cached
+        replica = self._replica_for(user)
+        if replica:
+            return replica.query(user)
+        response = self.http.get(endpoint, json=payload)
+        logger.info(f"Getting expense data. Endpoint: {endpoint}. Payload: {redact(payload)}")
+        data = self._get_key_from_json_response(response, key='data')
+        if response.status_code == 200:
+            self.cache.set(cache_key, data, size=len(response.content), owner=user)
+        return data
+
+    @on_http_error
+    def get_historical_page(self, username: str, offset: int, limit: int, use_cache: bool = True,
+                            after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        # Asks for one extra row so we know whether another page exists without a count query.
+        # after: only rows stored after the one with this id. Backends that do not support it return every row.
+        endpoint = self.urls.expense_history_endpoint()
+        cache_key = (endpoint, username, offset, limit, after)
+        if use_cache:
+            hit, cached = self.cache.get(cache_key)
+            if hit:
+                return cached
+            replica = self._replica_for(username)
+            if replica:
+                return replica.page(username, offset, limit)
+        if offset and not self._history_paging_supported(username):
+            # Ask for everything up to the end of this page and cut the page out here.
+            request_offset, request_limit = 0, offset + limit + 1
+        else:
+            request_offset, request_limit = offset, limit + 1
+        payload = dict(username=username, offset=request_offset, limit=request_limit)
+        if after:
+            payload["after"] = after
+        logger.info(f"Getting expense history page. Endpoint: {endpoint}. Payload: {redact(payload)}")
+        response = self.http.get(endpoint, json=payload)
+        if response.status_code != 200:
+            logger.error(f"Failed to get expense history page. Status Code: {response.status_code}")
+            return None
+        data = self._get_key_from_json_response(response, key='data') or []
+        if request_offset != offset or len(data) > request_limit:
+            # Either fetched from the start on purpose, or the backend ignored the paging parameters.
+            data = data[offset:offset + limit + 1]
+        page = (data[:limit], len(data) > limit)
+        if use_cache:
+            self.cache.set(cache_key, page, size=len(response.content), owner=username)
+        return page
+
+    def _history_paging_supported(self, username: str) -> bool:
+        # Two tiny requests: a backend that pages returns the second row of offset 0 as the first row of offset 1.
+        # Rows past the first page are otherwise indistinguishable from a repeat of it.
+        if self.history_paging_supported is None:
+            endpoint = self.urls.expense_history_endpoint()
+            first = self._get_key_from_json_response(
+                self.http.get(endpoint, json=dict(username=username, offset=0, limit=2)), key='data') or []
+            second = self._get_key_from_json_response(
+                self.http.get(endpoint, json=dict(username=username, offset=1, limit=1)), key='data') or []
+            if len(first) < 2:
+                # Too little history to tell; every page past the first is empty anyway.
+                return True
+            self.history_paging_supported = len(second) == 1 and second[0] == first[1]
+            if not self.history_paging_supported:
+                logger.info("History endpoint ignores offset/limit. Fetching from the start and paging locally.")
+        return self.history_paging_supported
+
+    def iter_historical_data(self, username: str, page_size: Optional[int] = None,
+                             use_cache: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        page_size = page_size or EnvVariables.history_page_size()
+        offset = 0
+        has_more = True
+        while has_more:
+            page = self.get_historical_page(username, offset=offset, limit=page_size, use_cache=use_cache)
+            if page is None:
+                # Stopping here would pass a truncated history off as the whole of it.
+                raise RuntimeError(f"Failed to get expense history at offset {offset}.")
+            rows, has_more = page
+            if rows:
+                yield rows
+            offset += page_size
 
     @on_http_error
     def clear_database_contents(self) -> int:
         endpoint = self.urls.clear_database_contents_endpoint()
-        response = requests.post(endpoint)
+        response = self.http.post(endpoint)
+        if response.status_code == 200:
+            self.cache.clear()
+            self.answer_cache.clear()
+            if self.replica:
+                self.replica.clear()
         return response.status_code
 
     @on_http_error
     def register_user(self, name: str, username: str, password: str) -> Tuple[bool, str]:
         payload = dict(name=name, username=username, password=password)
         endpoint = self.urls.register_endpoint()
-        logger.info(f"Requesting to register user. Endpoint: {endpoint}. Payload: {payload}")
-        response = requests.post(endpoint, json=payload)
+        logger.info(f"Requesting to register user. Endpoint: {endpoint}. Payload: {redact(payload)}")
+        response = self.http.post(endpoint, json=payload)
         success = response.status_code == 200
         name = self._get_key_from_json_response(response, key='name')
         if not success:
@@ -72,8 +273,8 @@ class Server:
     def login_user(self, username: str, password: str) -> Tuple[bool, str]:
         payload = dict(username=username, password=password)
         endpoint = self.urls.login_endpoint()
-        logger.info(f"Requesting to authenticate user. Endpoint: {endpoint}. Payload: {payload}")
-        response = requests.post(endpoint, json=payload)
+        logger.info(f"Requesting to authenticate user. Endpoint: {endpoint}. Payload: {redact(payload)}")
+        response = self.http.post(endpoint, json=payload)
         success = response.status_code == 200
         name = self._get_key_from_json_response(response, key='name')
         if not success:
@@ -81,13 +282,77 @@ class Server:
         return success, name
 
     @on_http_error
-    def send_message_to_chatbot(self, user: str, message: str) -> Optional[str]:
-        payload = dict(user=user, message=message)
+    def send_message_to_chatbot(self, user: str, message: str,
+                                context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        cached = self.answer_cache.get(user, message, context)
+        if cached is not None:
+            return cached
+        payload = dict(user=user, message=message, **(context or {}))
         endpoint = self.urls.chatbot_message_endpoint()
-        logger.info(f"Sending message to chatbot. Endpoint: {endpoint}. Payload: {payload}")
-        response = requests.post(endpoint, json=payload)
+        logger.info(f"Sending message to chatbot. Endpoint: {endpoint}. Payload: {redact(payload)}")
+        response = self.http.post(endpoint, json=payload)
         if response.status_code == 200:
-            message = self._get_key_from_json_response(response, key='message')
-            return message
+            reply = self._get_key_from_json_response(response, key='message')
+            if reply:
+                self.answer_cache.set(user, message, reply, context)
+            return reply
+
+    def stream_message_to_chatbot(self, user: str, message: str, context: Optional[Dict[str, Any]] = None,
+                                  cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        # Yields reply tokens as they arrive. Setting `cancel` (or closing the generator) drops the connection.
+        # `context` carries the conversation id and a short summary rather than the full transcript.
+        cached = self.answer_cache.get(user, message, context)
+        if cached is not None:
+            yield cached
+            return
+        payload = dict(user=user, message=message, **(context or {}))
+        endpoint = self.urls.chatbot_stream_endpoint()
+        logger.info(f"Streaming message to chatbot. Endpoint: {endpoint}. Payload: {redact(payload)}")
+        timer = StreamTimer(self.stream_metrics)
+        outcome = "cancelled"
+        try:
+            with self.http.post(endpoint, json=payload, stream=True,
+                                headers={"Accept": "text/event-stream"}) as response:
+                if response.status_code == 404:
+                    # Backend without a streaming route: fall back to the blocking endpoint.
+                    reply = self.send_message_to_chatbot(user=user, message=message, context=context)
+                    if reply:
+                        timer.on_token()
+                        yield reply
+                    outcome = "completed" if reply else "failed"
+                    return
+                if response.status_code != 200:
+                    logger.error(f"Chatbot stream failed. Status Code: {response.status_code}")
+                    outcome = "failed"
+                    return
+                tokens = []
+                for token in iter_response_tokens(response):
+                    if cancel is not None and cancel.is_set():
+                        return
+                    if token:
+                        timer.on_token()
+                        tokens.append(token)
+                        yield token
+                outcome = "completed"
+                if tokens:
+                    self.answer_cache.set(user, message, "".join(tokens), context)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Chatbot stream failed. Exception: {e}")
+            outcome = "failed"
+        finally:
+            timer.finish(outcome)
+            if timer.ttft is not None:
+                logger.info(f"Chatbot stream {outcome}. Time to first token: {timer.ttft:.3f}s")
+
+    @on_http_error
+    def warm_up_chatbot(self) -> int:
+        # Opens (or refreshes) a pooled connection to the chat host so the first message skips the handshake.
+        endpoint = self.urls.chatbot_url
+        response = self.http.head(endpoint)
+        return response.status_code
+
 
-server = Server()
+@lru_cache(maxsize=None)
+def get_server() -> Server:
+    # Built on first use instead of at import time.
+    return Server()
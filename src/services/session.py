@@ -0,0 +1,101 @@
+import logging
+import time
+from typing import Dict, Tuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.definitions.env_variables import EnvVariables
+from src.utils.metrics import metrics
+
+"""
+Pooled keep-alive HTTP session shared by every call to the node server
+"""
+
+logger = logging.getLogger(__name__)
+
+Timeout = Tuple[float, float]
+
+
+class HttpSession:
+    def __init__(self, pool_size: Optional[int] = None, max_retries: Optional[int] = None,
+                 backoff_factor: Optional[float] = None):
+        self.pool_size = pool_size if pool_size is not None else EnvVariables.http_pool_size()
+        self.max_retries = max_retries if max_retries is not None else EnvVariables.http_max_retries()
+        self.backoff_factor = backoff_factor if backoff_factor is not None else EnvVariables.http_backoff_factor()
+        self.default_timeout: Timeout = (EnvVariables.http_connect_timeout(), EnvVariables.http_read_timeout())
+        self.timeouts: Dict[str, Timeout] = {}
+        self.session = self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        # Read/status retries only apply to idempotent GETs. POSTs (store, login, chat) are never replayed
+        # once sent; urllib3 still retries failed connects since nothing reached the server.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.headers.update({"Connection": "keep-alive"})
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._adapter = adapter
+        return session
+
+    def set_timeout(self, endpoint: str, connect: float, read: float):
+        self.timeouts[endpoint] = (connect, read)
+
+    def timeout_for(self, endpoint: str) -> Timeout:
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def get(self, endpoint: str, **kwargs) -> requests.Response:
+        return self._request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> requests.Response:
+        return self._request("POST", endpoint, **kwargs)
+
+    def head(self, endpoint: str, **kwargs) -> requests.Response:
+        return self._request("HEAD", endpoint, **kwargs)
+
+    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+        path = urlsplit(endpoint).path
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, endpoint, **kwargs)
+        except requests.exceptions.RequestException as e:
+            metrics.record_error(f"{method} {path}", type(e).__name__)
+            raise
+        # For streamed responses this is time to headers, and the size is only known if the server sent it.
+        if kwargs.get("stream"):
+            response_bytes = int(response.headers.get("Content-Length", 0))
+        else:
+            response_bytes = len(response.content)
+        metrics.observe_request(
+            method, path, response.status_code, time.perf_counter() - started,
+            request_bytes=len(response.request.body or b""), response_bytes=response_bytes)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        # urllib3 keeps per-host counters: every request vs. every new socket opened.
+        requests_sent = 0
+        connections_opened = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            requests_sent += pool.num_requests
+            connections_opened += pool.num_connections
+        return dict(
+            requests=requests_sent,
+            new_connections=connections_opened,
+            reused_connections=max(requests_sent - connections_opened, 0))
+
+    def close(self):
+        self.session.close()
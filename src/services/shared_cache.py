@@ -0,0 +1,230 @@
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from src.definitions.env_variables import EnvVariables
+from src.services.cache import ResponseCache
+
+"""
+Cache tier shared by every worker process and kept across restarts. Same interface as ResponseCache, backed by
+a SQLite file (the local stand-in) or Redis, selected by SHARED_CACHE_URL. There is deliberately no in-process
+layer in front: an invalidation in one worker must be seen by the next read in any other.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Hits refresh an entry's LRU position at most this often, so reads do not all turn into writes.
+TOUCH_INTERVAL = 1.0
+
+
+class SQLiteCache:
+    def __init__(self, path: str, namespace: str, max_entries: int, max_bytes: int, ttl: float):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    owner TEXT,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (namespace, key))""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_owner ON cache_entries (namespace, owner)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, last_used)")
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        digest = _digest(key)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_used FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, digest)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            value, expires_at, last_used = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, digest))
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            if now - last_used > TOUCH_INTERVAL:
+                self._conn.execute("UPDATE cache_entries SET last_used = ? WHERE namespace = ? AND key = ?",
+                                   (now, self.namespace, digest))
+            self.hits += 1
+        return True, pickle.loads(value)
+
+    def set(self, key: Hashable, value: Any, size: int, owner: Optional[str] = None):
+        # What counts against the budget is the stored blob, not the caller's estimate.
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            logger.info(f"Entry of {len(blob)} bytes exceeds cache budget. Not caching {key}.")
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, owner, value, size, expires_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.namespace, _digest(key), owner, blob, len(blob), now + self.ttl, now))
+                self.expirations += self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?", (self.namespace, now)).rowcount
+                # Keep the most recently used entries that fit both budgets; everything past them goes.
+                self.evictions += self._conn.execute("""
+                    DELETE FROM cache_entries WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid,
+                                   SUM(size) OVER (ORDER BY last_used DESC, rowid DESC) AS running_bytes,
+                                   ROW_NUMBER() OVER (ORDER BY last_used DESC, rowid DESC) AS position
+                            FROM cache_entries WHERE namespace = ?)
+                        WHERE running_bytes > ? OR position > ?)""",
+                    (self.namespace, self.max_bytes, self.max_entries)).rowcount
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self.invalidations += self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, _digest(key))).rowcount
+
+    def invalidate_owner(self, owner: str):
+        with self._lock:
+            self.invalidations += self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND owner = ?", (self.namespace, owner)).rowcount
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,)).fetchone()
+        return _stats(self, backend="sqlite", entries=entries, size=size)
+
+
+class RedisCache:
+    # Eviction is left to Redis (e.g. maxmemory-policy allkeys-lru); entries still expire after ttl.
+    def __init__(self, url: str, namespace: str, max_entries: int, max_bytes: int, ttl: float):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SHARED_CACHE_URL points at Redis, but the redis package is not installed.") from e
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"expense-tracker:{self.namespace}:{_digest(key)}"
+
+    def _owner_key(self, owner: str) -> str:
+        return f"expense-tracker:{self.namespace}:owner:{owner}"
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        value = self.client.get(self._key(key))
+        if value is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, pickle.loads(value)
+
+    def set(self, key: Hashable, value: Any, size: int, owner: Optional[str] = None):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            logger.info(f"Entry of {len(blob)} bytes exceeds cache budget. Not caching {key}.")
+            return
+        ttl_ms = int(self.ttl * 1000)
+        pipeline = self.client.pipeline()
+        pipeline.set(self._key(key), blob, px=ttl_ms)
+        if owner:
+            pipeline.sadd(self._owner_key(owner), self._key(key))
+            pipeline.pexpire(self._owner_key(owner), ttl_ms)
+        pipeline.execute()
+
+    def delete(self, key: Hashable):
+        self.invalidations += self.client.delete(self._key(key))
+
+    def invalidate_owner(self, owner: str):
+        keys = list(self.client.smembers(self._owner_key(owner)))
+        if keys:
+            self.invalidations += self.client.delete(*keys)
+        self.client.delete(self._owner_key(owner))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"expense-tracker:{self.namespace}:*"))
+        if keys:
+            self.invalidations += self.client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = sum(1 for _ in self.client.scan_iter(f"expense-tracker:{self.namespace}:*"))
+        return _stats(self, backend="redis", entries=entries, size=None)
+
+
+Cache = Union[ResponseCache, SQLiteCache, RedisCache]
+
+
+def make_cache(namespace: str, max_entries: int, max_bytes: int, ttl: float) -> Cache:
+    # SHARED_CACHE_URL: empty for a per-process cache, sqlite:///path/to/file, or redis://host:port/db.
+    url = EnvVariables.shared_cache_url()
+    if not url:
+        return ResponseCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    scheme = urlparse(url).scheme
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisCache(url, namespace, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+    return SQLiteCache(path, namespace, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+
+
+def _digest(key: Hashable) -> str:
+    # Keys are tuples of strings, numbers and frozen dataclasses, whose repr is the same in every process.
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def _stats(cache: Union[SQLiteCache, RedisCache], backend: str, entries: int, size: Optional[int]) -> Dict[str, Any]:
+    lookups = cache.hits + cache.misses
+    return dict(
+        backend=backend,
+        entries=entries,
+        bytes=size,
+        max_entries=cache.max_entries,
+        max_bytes=cache.max_bytes,
+        hits=cache.hits,
+        misses=cache.misses,
+        hit_rate=cache.hits / lookups if lookups else 0.0,
+        evictions=cache.evictions,
+        expirations=cache.expirations,
+        invalidations=cache.invalidations)
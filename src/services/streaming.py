@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+
+"""
+Incremental parsing of chatbot responses (SSE or chunked text) and stream timing
+"""
+
+DONE = "[DONE]"
+
+
+def iter_response_tokens(response: requests.Response) -> Iterator[str]:
+    content_type = response.headers.get("Content-Type", "")
+    if "text/event-stream" in content_type:
+        yield from _iter_event_stream(response)
+    elif "application/json" in content_type:
+        # Backend answered without streaming; hand back the whole message at once.
+        message = json.loads(response.content).get("message")
+        if message:
+            yield message
+    else:
+        for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+            if chunk:
+                yield chunk
+
+
+def _iter_event_stream(response: requests.Response) -> Iterator[str]:
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == DONE:
+            return
+        yield _token_from_event(data)
+
+
+def _token_from_event(data: str) -> str:
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return data
+    if isinstance(event, dict):
+        return event.get("token") or event.get("message") or ""
+    return str(event)
+
+
+class StreamMetrics:
+    def __init__(self, window: int = 100):
+        self._lock = threading.Lock()
+        self.time_to_first_token = deque(maxlen=window)
+        self.durations = deque(maxlen=window)
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def record(self, ttft: Optional[float], duration: float, outcome: str):
+        with self._lock:
+            if ttft is not None:
+                self.time_to_first_token.append(ttft)
+            self.durations.append(duration)
+            if outcome == "cancelled":
+                self.cancelled += 1
+            elif outcome == "failed":
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ttft = sorted(self.time_to_first_token)
+            return dict(
+                completed=self.completed,
+                cancelled=self.cancelled,
+                failed=self.failed,
+                last_ttft_seconds=self.time_to_first_token[-1] if ttft else None,
+                p50_ttft_seconds=ttft[len(ttft) // 2] if ttft else None,
+                p95_ttft_seconds=ttft[int(len(ttft) * 0.95)] if ttft else None)
+
+
+class StreamTimer:
+    def __init__(self, metrics: StreamMetrics):
+        self.metrics = metrics
+        self.started = time.perf_counter()
+        self.ttft: Optional[float] = None
+
+    def on_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+    def finish(self, outcome: str):
+        self.metrics.record(self.ttft, time.perf_counter() - self.started, outcome)
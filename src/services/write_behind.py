@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from src.definitions.env_variables import EnvVariables
+from src.services.server import Server, get_server
+
+"""
+Local-first expense ingestion. Entries are written to a durable SQLite journal and acknowledged
+immediately; a background worker drains the journal to the node server in batches with retries.
+"""
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+FAILED = "failed"
+
+
+class WriteBehindQueue:
+    def __init__(self, server: Server, path: str, batch_size: int, max_attempts: int,
+                 flush_interval: float, backoff: float):
+        self.server = server
+        self.path = path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.flush_interval = flush_interval
+        self.backoff = backoff
+        # Queued writes only survive a restart if this file does: on Fly it must sit on a mounted volume.
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        logger.info(f"Write-behind journal at {os.path.abspath(path)}")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._create_schema()
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+
+    def _create_schema(self):
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL)""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS journal_status ON journal (status, next_attempt_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS journal_user ON journal (username, status)")
+
+    def enqueue(self, payload: Dict[str, Any]) -> int:
+        now = time.time()
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "INSERT INTO journal (username, payload, status, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                (payload.get("username", ""), json.dumps(payload), PENDING, now, now))
+        self._wake.set()
+        return cursor.lastrowid
+
+    def counts(self, username: str) -> Dict[str, int]:
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM journal WHERE username = ? GROUP BY status", (username,)).fetchall()
+        counts = {PENDING: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def retry_failed(self, username: str):
+        with self._db_lock:
+            self._conn.execute(
+                "UPDATE journal SET status = ?, attempts = 0, next_attempt_at = ? WHERE username = ? AND status = ?",
+                (PENDING, time.time(), username, FAILED))
+        self._wake.set()
+
+    def flush(self) -> int:
+        # Drains everything that is due. Safe to call from the script thread; the worker waits its turn.
+        sent = 0
+        with self._flush_lock:
+            while True:
+                batch = self._due_batch()
+                if not batch:
+                    return sent
+                delivered = self._send_batch(batch)
+                sent += delivered
+                if delivered == 0:
+                    return sent
+
+    def _due_batch(self) -> List[Tuple[int, str, str, int]]:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT id, username, payload, attempts FROM journal WHERE status = ? AND next_attempt_at <= ? "
+                "ORDER BY id LIMIT ?",
+                (PENDING, time.time(), self.batch_size)).fetchall()
+
+    def _send_batch(self, batch: List[Tuple[int, str, str, int]]) -> int:
+        # One bulk store per user in the batch (per-row stores if the backend has no bulk route).
+        by_user: Dict[str, List[Tuple[int, str, str, int]]] = defaultdict(list)
+        for entry in batch:
+            by_user[entry[1]].append(entry)
+        delivered = 0
+        for username, entries in by_user.items():
+            try:
+                codes = self.server.store_expenses(username, [json.loads(payload) for _, _, payload, _ in entries])
+                errors = [None if code == 200 else f"Status Code: {code}" for code in codes]
+            except Exception as e:
+                errors = [str(e)] * len(entries)
+            for (entry_id, _, _, attempts), error in zip(entries, errors):
+                if error is None:
+                    self._mark_delivered(entry_id)
+                    delivered += 1
+                else:
+                    self._mark_failed_attempt(entry_id, attempts + 1, error)
+        return delivered
+
+    def _mark_delivered(self, entry_id: int):
+        with self._db_lock:
+            self._conn.execute("DELETE FROM journal WHERE id = ?", (entry_id,))
+
+    def _mark_failed_attempt(self, entry_id: int, attempts: int, error: str):
+        status = FAILED if attempts >= self.max_attempts else PENDING
+        next_attempt_at = time.time() + self.backoff * (2 ** (attempts - 1))
+        logger.error(f"Failed to sync journal entry {entry_id} (attempt {attempts}). Error: {error}")
+        with self._db_lock:
+            self._conn.execute(
+                "UPDATE journal SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (status, attempts, error, next_attempt_at, entry_id))
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind worker failed to flush. Exception: {e}")
+
+
+@lru_cache(maxsize=None)
+def get_write_behind_queue() -> WriteBehindQueue:
+    # Entries left over from a previous process are picked up as soon as the worker starts.
+    return WriteBehindQueue(
+        server=get_server(),
+        path=EnvVariables.expense_journal_path(),
+        batch_size=EnvVariables.write_behind_batch_size(),
+        max_attempts=EnvVariables.write_behind_max_attempts(),
+        flush_interval=EnvVariables.write_behind_flush_interval(),
+        backoff=EnvVariables.write_behind_backoff())
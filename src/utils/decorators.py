@@ -1,24 +1,36 @@
 import logging
+import time
 from functools import wraps
 from typing import Tuple
 
 import requests
 import streamlit as st
 
+from src.utils.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
 
 def on_http_error(func):
+    # Also records each call's latency and any error under the method's name (e.g. "Server.login_user").
+    operation = func.__qualname__
+
+    @wraps(func)
     def wrapper(*args, **kwargs):
+        started = time.perf_counter()
         try:
             response = func(*args, **kwargs)
             return response
         except requests.exceptions.ConnectionError:
+            metrics.record_error(operation, "connection")
             err_msg = "Request failed. Connection is not found"
             logger.error(err_msg)
             raise requests.exceptions.ConnectionError(err_msg)
         except Exception as e:
+            metrics.record_error(operation, type(e).__name__)
             logger.error(f"Request failed. An unknown error occurred. Exception: {e}")
+        finally:
+            metrics.observe_call(operation, time.perf_counter() - started)
     return wrapper
 
 
@@ -0,0 +1,222 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+"""
+In-process request and hot-path metrics: latency histograms, payload sizes, status codes, error counts
+and timing spans. Exposed as a dict for the debug panel and as Prometheus text.
+"""
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+REDACTED = "***"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...], window: int = 500):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        # Recent samples for percentiles on the panel; the buckets are what gets exported.
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        rows = []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            rows.append((str(bound), total))
+        return rows
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_bytes: Dict[Tuple[str, str], Histogram] = {}
+        self.response_bytes: Dict[Tuple[str, str], Histogram] = {}
+        self.status_codes: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.call_latency: Dict[str, Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.spans: Dict[str, Histogram] = {}
+
+    def observe_request(self, method: str, endpoint: str, status: int, seconds: float,
+                        request_bytes: int, response_bytes: int):
+        key = (method, endpoint)
+        with self._lock:
+            self._histogram(self.request_latency, key, LATENCY_BUCKETS).observe(seconds)
+            self._histogram(self.request_bytes, key, SIZE_BUCKETS).observe(request_bytes)
+            self._histogram(self.response_bytes, key, SIZE_BUCKETS).observe(response_bytes)
+            self.status_codes[(method, endpoint, status)] += 1
+
+    def observe_call(self, operation: str, seconds: float):
+        with self._lock:
+            self._histogram(self.call_latency, operation, LATENCY_BUCKETS).observe(seconds)
+
+    def record_error(self, operation: str, kind: str):
+        with self._lock:
+            self.errors[(operation, kind)] += 1
+
+    def observe_span(self, name: str, seconds: float):
+        with self._lock:
+            self._histogram(self.spans, name, LATENCY_BUCKETS).observe(seconds)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_span(name, time.perf_counter() - started)
+
+    @staticmethod
+    def _histogram(store: Dict[Any, Histogram], key: Any, buckets: Tuple[float, ...]) -> Histogram:
+        if key not in store:
+            store[key] = Histogram(buckets)
+        return store[key]
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            endpoints = []
+            for (method, endpoint), latency in sorted(self.request_latency.items()):
+                statuses = {status: count for (m, e, status), count in self.status_codes.items()
+                            if (m, e) == (method, endpoint)}
+                endpoints.append(dict(
+                    method=method,
+                    endpoint=endpoint,
+                    requests=latency.count,
+                    p50_ms=_ms(latency.percentile(0.5)),
+                    p95_ms=_ms(latency.percentile(0.95)),
+                    avg_request_bytes=self.request_bytes[(method, endpoint)].sum / latency.count,
+                    avg_response_bytes=self.response_bytes[(method, endpoint)].sum / latency.count,
+                    status_codes=statuses))
+            operations = [dict(
+                operation=operation,
+                calls=latency.count,
+                p50_ms=_ms(latency.percentile(0.5)),
+                p95_ms=_ms(latency.percentile(0.95)),
+                errors=sum(count for (op, _), count in self.errors.items() if op == operation))
+                for operation, latency in sorted(self.call_latency.items())]
+            spans = [dict(span=name, count=h.count, p50_ms=_ms(h.percentile(0.5)), p95_ms=_ms(h.percentile(0.95)),
+                          total_ms=h.sum * 1000)
+                     for name, h in sorted(self.spans.items())]
+            errors = [dict(operation=operation, kind=kind, count=count)
+                      for (operation, kind), count in sorted(self.errors.items())]
+        return dict(endpoints=endpoints, operations=operations, spans=spans, errors=errors)
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            _export_histograms(lines, "expense_tracker_http_request_duration_seconds",
+                               "Latency of requests to the node server.", self.request_latency, ("method", "endpoint"))
+            _export_histograms(lines, "expense_tracker_http_request_size_bytes",
+                               "Request body size.", self.request_bytes, ("method", "endpoint"))
+            _export_histograms(lines, "expense_tracker_http_response_size_bytes",
+                               "Response body size.", self.response_bytes, ("method", "endpoint"))
+            lines.append("# HELP expense_tracker_http_responses_total Responses by status code.")
+            lines.append("# TYPE expense_tracker_http_responses_total counter")
+            for (method, endpoint, status), count in sorted(self.status_codes.items()):
+                lines.append(f"expense_tracker_http_responses_total"
+                             f"{_labels(method=method, endpoint=endpoint, status=status)} {count}")
+            _export_histograms(lines, "expense_tracker_operation_duration_seconds",
+                               "Latency of Server operations, including retries.", self.call_latency, ("operation",))
+            lines.append("# HELP expense_tracker_errors_total Failed Server operations.")
+            lines.append("# TYPE expense_tracker_errors_total counter")
+            for (operation, kind), count in sorted(self.errors.items()):
+                lines.append(f"expense_tracker_errors_total{_labels(operation=operation, kind=kind)} {count}")
+            _export_histograms(lines, "expense_tracker_span_duration_seconds",
+                               "Hot-path timings (DataFrame conversion, rollups, charts).", self.spans, ("span",))
+        return "\n".join(lines) + "\n"
+
+
+def _export_histograms(lines: List[str], name: str, help_text: str, store: Dict[Any, Histogram],
+                       label_names: Tuple[str, ...]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(store.items()):
+        values = key if isinstance(key, tuple) else (key,)
+        labels = dict(zip(label_names, values))
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else seconds * 1000
+
+
+def timed(name: str):
+    # Records how long each call takes as a span.
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def redact(payload: Any) -> Any:
+    # Keeps the shape of a payload for logs (keys, list lengths) but none of its values.
+    if isinstance(payload, dict):
+        return {key: redact(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return f"<{len(payload)} items>"
+    return REDACTED
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_metrics(port: int) -> ThreadingHTTPServer:
+    # Scrape target for Prometheus at http://<host>:<port>/metrics, next to the Streamlit server.
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,73 @@
+import datetime
+from datetime import datetime as dt
+from typing import Optional, Tuple
+
+from src.definitions.enums import Period
+
+"""
+Date ranges for the dashboard period selector. Ranges are half-open: [start, end).
+"""
+
+REQUEST_DATE_FORMAT = "%m-%d-%Y"
+
+
+def period_bounds(period: Period, anchor: datetime.date,
+                  custom_range: Optional[Tuple[datetime.date, datetime.date]] = None) -> Tuple[dt, dt]:
+    if period is Period.WEEK:
+        start = anchor - datetime.timedelta(days=anchor.weekday())
+        return _midnight(start), _midnight(start + datetime.timedelta(days=7))
+    if period is Period.QUARTER:
+        first_month = 3 * ((anchor.month - 1) // 3) + 1
+        start = datetime.date(anchor.year, first_month, 1)
+        return _midnight(start), _midnight(_add_months(start, 3))
+    if period is Period.YEAR:
+        return dt(anchor.year, 1, 1), dt(anchor.year + 1, 1, 1)
+    if period is Period.CUSTOM and custom_range:
+        first, last = custom_range
+        # The date picker's last day is inclusive.
+        return _midnight(first), _midnight(last + datetime.timedelta(days=1))
+    start = datetime.date(anchor.year, anchor.month, 1)
+    return _midnight(start), _midnight(_add_months(start, 1))
+
+
+def shift_anchor(period: Period, anchor: datetime.date, steps: int) -> datetime.date:
+    if period is Period.WEEK:
+        return anchor + datetime.timedelta(weeks=steps)
+    if period is Period.QUARTER:
+        return _add_months(anchor.replace(day=1), 3 * steps)
+    if period is Period.YEAR:
+        return anchor.replace(year=anchor.year + steps, day=1)
+    return _add_months(anchor.replace(day=1), steps)
+
+
+def shift_custom_range(custom_range: Tuple[datetime.date, datetime.date],
+                       steps: int) -> Tuple[datetime.date, datetime.date]:
+    # A custom range moves by its own length.
+    first, last = custom_range
+    length = (last - first) + datetime.timedelta(days=1)
+    return first + length * steps, last + length * steps
+
+
+def period_label(period: Period, start: dt, end: dt) -> str:
+    last = (end - datetime.timedelta(days=1)).date()
+    if period is Period.MONTH:
+        return start.strftime("%B %Y")
+    if period is Period.QUARTER:
+        return f"Q{(start.month - 1) // 3 + 1} {start.year}"
+    if period is Period.YEAR:
+        return str(start.year)
+    return f"{start.date():%b %d, %Y} - {last:%b %d, %Y}"
+
+
+def as_request_dates(start: dt, end: dt) -> Tuple[str, str]:
+    return start.strftime(REQUEST_DATE_FORMAT), end.strftime(REQUEST_DATE_FORMAT)
+
+
+def _add_months(day: datetime.date, months: int) -> datetime.date:
+    # Year rolls over correctly, including December -> January.
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _midnight(day: datetime.date) -> dt:
+    return dt.combine(day, datetime.time.min)
@@ -0,0 +1,90 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime as dt
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.definitions.constants import DATE, AMOUNT, CATEGORY
+from src.utils.metrics import timed
+from src.utils.utils import EXPENSE_CATEGORIES
+
+"""
+Daily / category aggregates shared by every dashboard widget
+"""
+
+
+@dataclass
+class ExpenseRollup:
+    start_date: dt
+    end_date: dt
+    categories: List[str]
+    daily: np.ndarray
+    by_category: np.ndarray
+    total: float
+
+    @classmethod
+    @timed("rollup")
+    def from_dataframe(cls, df: Optional[pd.DataFrame], start_date: dt, end_date: dt) -> "ExpenseRollup":
+        n_days = (end_date.date() - start_date.date()).days
+        categories = list(EXPENSE_CATEGORIES)
+        if df is None or df.empty:
+            return cls(start_date, end_date, categories, np.zeros(n_days), np.zeros(len(categories)), 0.0)
+
+        # One pass over the raw columns: day offsets and category codes feed bincount directly.
+        amounts = df[AMOUNT].to_numpy(dtype=np.float64, na_value=0.0)
+        offsets = (_as_days(df[DATE]) - np.datetime64(start_date.date(), "D")).astype(np.int64)
+        in_range = (offsets >= 0) & (offsets < n_days)
+        daily = np.bincount(offsets[in_range], weights=amounts[in_range], minlength=n_days)
+
+        if isinstance(df[CATEGORY].dtype, pd.CategoricalDtype):
+            categories = list(df[CATEGORY].cat.categories)
+            codes = df[CATEGORY].cat.codes.to_numpy()
+        else:
+            codes_index, uniques = pd.factorize(df[CATEGORY])
+            categories, codes = list(uniques), codes_index
+        known = in_range & (codes >= 0)
+        by_category = np.bincount(codes[known], weights=amounts[known], minlength=len(categories))
+        return cls(start_date, end_date, categories, daily, by_category, float(daily.sum()))
+
+    @property
+    def days(self) -> np.ndarray:
+        return np.arange(np.datetime64(self.start_date.date(), "D"), np.datetime64(self.end_date.date(), "D"))
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        return np.cumsum(self.daily)
+
+    def category_totals(self) -> Dict[str, float]:
+        return dict(zip(self.categories, self.by_category.tolist()))
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha1(self.daily.tobytes())
+        digest.update(f"{self.start_date.date()}:{self.end_date.date()}".encode())
+        return digest.hexdigest()
+
+    def day_offset(self, day: date) -> Optional[int]:
+        offset = (day - self.start_date.date()).days
+        return offset if 0 <= offset < len(self.daily) else None
+
+    def add(self, day: date, category: str, amount: float) -> Optional[int]:
+        # O(1) update for a single stored expense. Returns the day offset that changed, if any.
+        offset = self.day_offset(day)
+        if offset is None:
+            return None
+        self.daily[offset] += amount
+        if category not in self.categories:
+            self.categories.append(category)
+            self.by_category = np.append(self.by_category, 0.0)
+        self.by_category[self.categories.index(category)] += amount
+        self.total += amount
+        return offset
+
+
+def _as_days(dates: pd.Series) -> np.ndarray:
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)
+    if pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        return dates.to_numpy().astype("datetime64[D]")
+    return np.array(dates.tolist(), dtype="datetime64[D]")
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from src.definitions.env_variables import EnvVariables
+from src.services.shared_cache import Cache, make_cache
+
+"""
+Signed, expiring, revocable session tokens. A browser refresh starts a new Streamlit session; the token lets it
+restore the login without sending credentials again. The backend issues no tokens, so they are minted and checked
+here. Each token names a server-side session record, and is only honoured while that record exists: sign-out and
+idle expiry delete it, so a copied or bookmarked URL stops working at the same moment.
+"""
+
+# Records are small; this is a generous bound, and an evicted record only means one more login.
+MAX_SESSIONS = 100_000
+
+
+@dataclass(frozen=True)
+class SessionClaims:
+    username: str
+    name: str
+    session_id: str
+    expires_at: int
+
+
+class SessionTokens:
+    def __init__(self, secret: bytes, ttl: float, store: Cache):
+        self.secret = secret
+        self.ttl = ttl
+        # Shared with the other workers when SHARED_CACHE_URL is set, so revocation reaches all of them.
+        self.store = store
+
+    def issue(self, username: str, name: str) -> str:
+        session_id = secrets.token_urlsafe(16)
+        self.store.set(("session", session_id), username, size=len(username), owner=username)
+        payload = json.dumps(dict(u=username, n=name, sid=session_id, exp=int(time.time() + self.ttl)),
+                             separators=(",", ":"))
+        body = _encode(payload.encode())
+        return f"{body}.{self._sign(body)}"
+
+    def verify(self, token: str) -> Optional[SessionClaims]:
+        # None for a token that is malformed, forged, expired or revoked.
+        claims = self._claims(token)
+        if claims is None:
+            return None
+        hit, username = self.store.get(("session", claims.session_id))
+        if not hit or username != claims.username:
+            return None
+        return claims
+
+    def revoke(self, token: str):
+        claims = self._claims(token)
+        if claims is not None:
+            self.store.delete(("session", claims.session_id))
+
+    def revoke_user(self, username: str):
+        # Every session of this user, on every worker.
+        self.store.invalidate_owner(username)
+
+    def _claims(self, token: str) -> Optional[SessionClaims]:
+        # Query parameters are attacker-controlled; compare_digest only accepts ASCII strings.
+        if not token or not token.isascii():
+            return None
+        body, _, signature = token.partition(".")
+        if not body or not hmac.compare_digest(signature, self._sign(body)):
+            return None
+        try:
+            payload = json.loads(_decode(body))
+            claims = SessionClaims(username=payload["u"], name=payload.get("n") or payload["u"],
+                                   session_id=payload["sid"], expires_at=int(payload["exp"]))
+        except (ValueError, TypeError, KeyError, UnicodeDecodeError):
+            return None
+        if not claims.username or claims.expires_at < time.time():
+            return None
+        return claims
+
+    def _sign(self, body: str) -> str:
+        return _encode(hmac.new(self.secret, body.encode(), hashlib.sha256).digest())
+
+
+def _encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+@lru_cache(maxsize=None)
+def get_session_tokens() -> SessionTokens:
+    # Without SESSION_SECRET the key is per process: tokens stop working after a restart or on another worker.
+    secret = EnvVariables.session_secret()
+    ttl = EnvVariables.session_token_ttl()
+    return SessionTokens(
+        secret=secret.encode() if secret else secrets.token_bytes(32),
+        ttl=ttl,
+        store=make_cache("sessions", max_entries=MAX_SESSIONS, max_bytes=16 * 1024 * 1024, ttl=ttl))
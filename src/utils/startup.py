@@ -0,0 +1,39 @@
+import logging
+import time
+from typing import Any, Dict, List, Tuple
+
+"""
+Records how long the first script run of a process takes, phase by phase
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self.finished = False
+
+    def mark(self, phase: str):
+        # Streamlit re-executes the script on every rerun; only the first (cold) run is recorded.
+        if not self.finished:
+            self.marks.append((phase, time.perf_counter()))
+
+    def finish(self):
+        if self.finished:
+            return
+        self.mark("first render")
+        self.finished = True
+        logger.info(f"Startup timing report: {self.report()}")
+
+    def report(self) -> Dict[str, Any]:
+        phases = {}
+        previous = self.started
+        for phase, timestamp in self.marks:
+            phases[phase] = round(timestamp - previous, 4)
+            previous = timestamp
+        return dict(total_seconds=round(previous - self.started, 4), phases=phases)
+
+
+startup_timer = StartupTimer()
@@ -1,22 +1,71 @@
-from typing import Dict, List, Any
+import datetime
+from typing import TYPE_CHECKING, Dict, List, Any, Sequence
 
-import pandas as pd
+from src.definitions.constants import DATE, AMOUNT, CATEGORY, USER, DATE_FORMAT
+from src.definitions.enums import ExpenseCategory
+from src.utils.metrics import timed
 
-from src.definitions.constants import DATE
+if TYPE_CHECKING:
+    import pandas as pd
 
+EXPENSE_CATEGORIES = [category.value for category in ExpenseCategory if category is not ExpenseCategory.DEFAULT]
 
-def response_as_dataframe(response: List[Dict[str, Any]]):
-    df = pd.DataFrame(response)
-    print(df.empty)
-    if len(df) == 0:
-        return df
-    df.columns = [c.upper() for c in df.columns]
-    df[DATE] = pd.to_datetime(df[DATE])
-    df = df.sort_values(by=DATE, ascending=True)
-    df = df.drop(columns=['USER'])
+
+@timed("dataframe")
+def response_as_dataframe(response: List[Dict[str, Any]], assume_sorted: bool = False) -> "pd.DataFrame":
+    # Builds each column once with its final dtype instead of inferring, renaming and copying a whole frame.
+    # pandas is imported here rather than at module level so the entry screens never load it.
+    import numpy as np
+    import pandas as pd
+
+    if not response:
+        return pd.DataFrame()
+    columns = {}
+    for key in response[0]:
+        column = key.upper()
+        # Backend bookkeeping such as _id and __v is not shown.
+        if column == USER or key.startswith("_"):
+            continue
+        values = [row.get(key) for row in response]
+        if column == AMOUNT:
+            columns[column] = np.array(values, dtype=np.float64)
+        elif column == DATE:
+            columns[column] = _parse_dates(values)
+        elif column == CATEGORY:
+            columns[column] = _as_category(values)
+        else:
+            columns[column] = values
+    df = pd.DataFrame(columns, copy=False)
+    if DATE in df.columns and not assume_sorted and not df[DATE].is_monotonic_increasing:
+        df = df.take(np.argsort(df[DATE].to_numpy(), kind="stable"))
     return df
 
 
+def _parse_dates(values: Sequence[Any]) -> "pd.DatetimeIndex":
+    import pandas as pd
+
+    if isinstance(values[0], (int, float)):
+        return pd.to_datetime(values, unit="ms")
+    return pd.to_datetime(values, format=DATE_FORMAT)
+
+
+def _as_category(values: Sequence[Any]) -> "pd.Categorical":
+    import pandas as pd
+
+    categories = EXPENSE_CATEGORIES
+    unknown = set(values).difference(categories)
+    unknown.discard(None)
+    if unknown:
+        # Keep legacy or free-form categories rather than turning them into NaN.
+        categories = categories + sorted(unknown)
+    return pd.Categorical(values, categories=categories)
+
+
+def to_backend_timestamp(date: datetime.date) -> float:
+    # Converts to datetime then gets timestamp (ms), shifted a day as the server expects.
+    return (datetime.datetime.combine(date, datetime.time.min) + datetime.timedelta(days=1)).timestamp() * 1000
+
+
 def validate_float_input(value: str) -> bool:
     try:
         float(value)
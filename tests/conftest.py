@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+import pytest
+
+from benchmarks.mock_backend import MockBackend
+
+# The app reads its configuration from the environment when components are first built, so the mock backend and
+# a throwaway journal are in place before any test imports src.
+_backend = MockBackend(rows=200, users=2, days=20).start()
+_scratch = tempfile.mkdtemp(prefix="expense-tracker-tests-")
+os.environ["SERVER_BASE_URL"] = _backend.base_url
+os.environ["EXPENSE_JOURNAL_PATH"] = os.path.join(_scratch, "journal.sqlite3")
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture(scope="session")
+def backend() -> MockBackend:
+    return _backend
+
+
+@pytest.fixture
+def app(backend):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(APP_PATH, default_timeout=30).run()
+
+
+def login(at, username: str):
+    at.button[0].click().run()
+    at.text_input[0].input(username)
+    at.text_input[1].input("password")
+    # The Login callback's arguments are bound when the button renders.
+    at.run()
+    at.button[0].click().run()
+    assert not at.exception, at.exception
+    assert at.session_state["logged_in"]
+    return at
@@ -0,0 +1,70 @@
+import datetime
+import types
+
+from src.app.chat_history import ChatHistory
+from src.services import answer_cache as answer_cache_module
+from src.services.answer_cache import AnswerCache
+
+FIRST_TURN = dict(conversation_id="c1", summary="", turn=1)
+
+
+def _cache(similarity_threshold: float = 0) -> AnswerCache:
+    return AnswerCache(max_entries=16, max_bytes=10_000, ttl=3600, similarity_threshold=similarity_threshold)
+
+
+def test_opening_questions_are_reused_across_conversations():
+    cache = _cache()
+    cache.set("alice", "How much did I spend on food?", "Php 1,200", FIRST_TURN)
+    # A reload starts a new conversation with a new id; the same opening question still hits.
+    assert cache.get("alice", "how much did i spend on FOOD", dict(FIRST_TURN, conversation_id="c2")) == "Php 1,200"
+    assert cache.get("alice", "How much did I spend on food?") == "Php 1,200"
+    assert cache.get("bob", "How much did I spend on food?", FIRST_TURN) is None
+
+
+def test_follow_ups_are_never_cached():
+    cache = _cache()
+    history = ChatHistory(capacity=50, window=10, summary_chars=1000)
+    replies = {}
+    for prompt, reply in [("How much on food?", "Php 1,200"), ("and last month?", "Food last month: Php 250"),
+                          ("How much on rent?", "Php 9,000"), ("and last month?", "Rent last month: Php 9,000")]:
+        history.append(role="user", content=prompt)
+        replies[prompt] = cache.get("alice", prompt, history.context())
+        if replies[prompt] is None:
+            cache.set("alice", prompt, reply, history.context())
+        history.append(role="assistant", content=reply)
+    assert replies["and last month?"] is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_folded_history_counts_as_a_follow_up():
+    cache = _cache()
+    cache.set("alice", "Totals?", "Php 10", dict(conversation_id="c1", summary="user: food", turn=1))
+    assert cache.get("alice", "Totals?", FIRST_TURN) is None
+
+
+def test_answers_do_not_outlive_the_day(monkeypatch):
+    cache = _cache()
+    cache.set("alice", "How much did I spend this month?", "Php 5,000", FIRST_TURN)
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    fake_date = type("FakeDate", (datetime.date,), dict(today=classmethod(lambda cls: tomorrow)))
+    monkeypatch.setattr(answer_cache_module, "datetime", types.SimpleNamespace(date=fake_date))
+    assert cache.get("alice", "How much did I spend this month?", FIRST_TURN) is None
+
+
+def test_similar_prompts_match():
+    cache = _cache(similarity_threshold=0.5)
+    cache.set("alice", "how much did i spend on food this week", "Php 300", FIRST_TURN)
+    assert cache.get("alice", "how much did i spend on food this week please", FIRST_TURN) == "Php 300"
+    assert cache.get("alice", "how much did i spend on food this week please",
+                     dict(FIRST_TURN, turn=2)) is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_invalidate_user_drops_answers_and_vectors():
+    cache = _cache(similarity_threshold=0.5)
+    cache.set("alice", "food total", "Php 300", FIRST_TURN)
+    cache.set("bob", "food total", "Php 100", FIRST_TURN)
+    cache.invalidate_user("alice")
+    assert cache.get("alice", "food total", FIRST_TURN) is None
+    assert cache.get("bob", "food total", FIRST_TURN) == "Php 100"
+    assert all(key[0] == "bob" for key in cache._vectors)
@@ -0,0 +1,69 @@
+import pytest
+
+from src.services import cache as cache_module
+from src.services.cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(max_entries=10, max_bytes=1000, ttl=60)
+    cache.set("key", "value", size=5)
+    clock[0] += 59
+    assert cache.get("key") == (True, "value")
+    clock[0] += 1
+    assert cache.get("key") == (False, None)
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["bytes"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, max_bytes=1000, ttl=60)
+    cache.set("a", 1, size=1)
+    cache.set("b", 2, size=1)
+    cache.get("a")
+    cache.set("c", 3, size=1)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_is_enforced():
+    cache = ResponseCache(max_entries=100, max_bytes=10, ttl=60)
+    cache.set("a", "a", size=4)
+    cache.set("b", "b", size=4)
+    cache.set("c", "c", size=4)
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["bytes"] == 8
+    # Too large to ever fit: not cached, and nothing else is evicted for it.
+    cache.set("huge", "huge", size=11)
+    assert cache.get("huge") == (False, None)
+    assert cache.stats()["entries"] == 2
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = ResponseCache(max_entries=10, max_bytes=10, ttl=60)
+    cache.set("a", "old", size=8)
+    cache.set("a", "new", size=3)
+    assert cache.get("a") == (True, "new")
+    assert cache.stats()["bytes"] == 3
+
+
+def test_invalidate_owner_and_delete():
+    cache = ResponseCache(max_entries=10, max_bytes=1000, ttl=60)
+    cache.set(("alice", 1), 1, size=1, owner="alice")
+    cache.set(("alice", 2), 2, size=1, owner="alice")
+    cache.set(("bob", 1), 3, size=1, owner="bob")
+    cache.invalidate_owner("alice")
+    assert cache.get(("alice", 1)) == (False, None)
+    assert cache.get(("bob", 1)) == (True, 3)
+    cache.delete(("bob", 1))
+    cache.delete(("bob", 1))
+    assert cache.get(("bob", 1)) == (False, None)
+    assert cache.stats()["invalidations"] == 3
@@ -0,0 +1,52 @@
+import datetime
+
+from tests.conftest import login
+
+
+def _store_expense(at, category: str, description: str, amount: str):
+    [button for button in at.button if button.label == "Add Expenses"][0].click().run()
+    at.selectbox[0].select(category)
+    at.text_input[0].input(description)
+    at.text_input[1].input(amount)
+    at.date_input[0].set_value(datetime.date.today())
+    at.run()
+    [button for button in at.button if button.label == "Store"][0].click().run()
+    assert not at.exception, at.exception
+    [button for button in at.button if button.label == "Exit"][0].click().run()
+
+
+def test_stored_expense_outside_filter_leaves_dashboard_unchanged(app, backend):
+    login(app, backend.data.users[0])
+    app.multiselect(key="filter_categories_select").set_value(["Leisure"]).run()
+    total = app.session_state["month_total"]
+    rows = len(app.session_state["monthly_data"])
+    version = app.session_state["data_version"]
+
+    _store_expense(app, "Utilities", "power bill", "1000")
+
+    assert app.session_state["month_total"] == total
+    assert len(app.session_state["monthly_data"]) == rows
+    assert app.session_state["data_version"] == version
+    assert set(app.session_state["monthly_data"].frame["CATEGORY"]) <= {"Leisure"}
+
+
+def test_stored_expense_inside_filter_is_applied(app, backend):
+    login(app, backend.data.users[1])
+    app.multiselect(key="filter_categories_select").set_value(["Leisure"]).run()
+    total = app.session_state["month_total"]
+    rows = len(app.session_state["monthly_data"])
+
+    _store_expense(app, "Leisure", "movie", "250")
+
+    assert app.session_state["month_total"] == total + 250
+    assert len(app.session_state["monthly_data"]) == rows + 1
+    assert app.session_state["view_table"][1].num_rows == rows + 1
+
+
+def test_empty_period_clears_the_previous_chart(app, backend):
+    login(app, backend.data.users[0])
+    assert app.session_state["plot"] is not None
+    for _ in range(3):
+        [button for button in app.button if button.label == "◀"][0].click().run()
+    assert app.session_state["monthly_data"] is None
+    assert "plot" not in app.session_state
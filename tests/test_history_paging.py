@@ -0,0 +1,83 @@
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.services.exporter import CSV_FORMAT, export_history
+
+ROWS = [dict(category="Food", description=f"expense {i}", amount=float(i), date=f"2025-12-{i + 1:02d}T00:00:00Z")
+        for i in range(7)]
+
+
+class _HistoryStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # "paged" honours offset and limit, "limit" only limit, "none" neither.
+    paging = "paged"
+    rows = ROWS
+    fail_offsets = ()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        offset, limit = body.get("offset", 0), body.get("limit", len(self.rows))
+        if offset in self.fail_offsets:
+            status, payload = 500, dict(error="boom")
+        elif self.paging == "paged":
+            status, payload = 200, dict(data=self.rows[offset:offset + limit])
+        elif self.paging == "limit":
+            status, payload = 200, dict(data=self.rows[:limit])
+        else:
+            status, payload = 200, dict(data=self.rows)
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+@pytest.fixture
+def history_server(monkeypatch):
+    servers = []
+
+    def start(**attributes):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), type("Handler", (_HistoryStub,), attributes))
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        monkeypatch.setenv("SERVER_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}")
+        monkeypatch.setenv("LOCAL_REPLICA_PATH", "")
+        from src.services.server import Server
+
+        return Server()
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.mark.parametrize("paging", ["paged", "limit", "none"])
+def test_pages_are_cut_at_the_right_offset(history_server, paging):
+    server = history_server(paging=paging)
+    pages = list(server.iter_historical_data("alice", page_size=3, use_cache=False))
+    assert [[row["description"] for row in page] for page in pages] == [
+        ["expense 0", "expense 1", "expense 2"], ["expense 3", "expense 4", "expense 5"], ["expense 6"]]
+    assert server.history_paging_supported is (paging == "paged")
+
+
+def test_backend_returning_exactly_one_extra_row_does_not_loop(history_server):
+    # Ignores offset/limit, and the whole history happens to be limit + 1 rows.
+    server = history_server(paging="none", rows=ROWS[:4])
+    assert server.get_historical_page("alice", offset=3, limit=3) == ([ROWS[3]], False)
+    assert sum(len(page) for page in server.iter_historical_data("alice", page_size=3, use_cache=False)) == 4
+
+
+def test_failed_page_fails_the_export(history_server):
+    server = history_server(fail_offsets=(3,))
+    assert server.get_historical_page("alice", offset=3, limit=3, use_cache=False) is None
+    with pytest.raises(RuntimeError):
+        export_history(server, "alice", CSV_FORMAT, io.BytesIO(), page_size=3)
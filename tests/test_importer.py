@@ -0,0 +1,55 @@
+import datetime
+import io
+
+from src.services.importer import ExpenseImporter, iter_csv_chunks, iter_ofx_chunks, validate_chunk
+
+CSV = """category,description,amount,date
+Leisure,Dinner,450,2025-12-01T23:30:00-05:00
+Utilities,Power,1200,2025-12-02T08:15:00+08:00
+Leisure,Movie,300,2025-12-03
+Education,Books,not a number,2025-12-04
+Leisure,Concert,900,someday
+"""
+
+OFX = b"""OFXHEADER:100
+<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20251201120000[-5:EST]<TRNAMT>-12.50<NAME>Coffee shop</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20251202<TRNAMT>25000.00<NAME>Salary</STMTTRN>
+<STMTTRN><TRNTYPE>DEP<DTPOSTED>20251203<TRNAMT>+80.00<NAME>Refund</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20251204<TRNAMT>7.00<MEMO>Bank fee</STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+
+class RecordingServer:
+    def __init__(self):
+        self.stored = []
+
+    def store_expenses(self, username, payloads):
+        self.stored.extend(payloads)
+        return [200] * len(payloads)
+
+
+def test_mixed_timezone_offsets_keep_the_written_day():
+    valid = validate_chunk(next(iter_csv_chunks(io.StringIO(CSV), chunk_size=100)))
+    assert list(valid["description"]) == ["Dinner", "Power", "Movie"]
+    assert list(valid["date"]) == [datetime.date(2025, 12, 1), datetime.date(2025, 12, 2), datetime.date(2025, 12, 3)]
+
+
+def test_unparseable_dates_are_invalid_rows_not_a_crash():
+    chunk = next(iter_csv_chunks(io.StringIO("category,description,amount,date\nLeisure,x,1,soon\n"), 10))
+    assert validate_chunk(chunk).empty
+
+
+def test_ofx_imports_only_debits():
+    rows = next(iter_ofx_chunks(io.BytesIO(OFX), chunk_size=100))
+    assert list(rows["description"]) == ["Coffee shop", "Bank fee"]
+    assert list(rows["amount"]) == ["12.50", "7.00"]
+
+
+def test_import_reports_invalid_rows_and_stores_the_rest():
+    server = RecordingServer()
+    importer = ExpenseImporter(server, chunk_size=2, batch_size=10, concurrency=1)
+    progress = importer.run(io.StringIO(CSV), "csv", "alice")
+    assert (progress.rows_read, progress.stored, progress.invalid, progress.failed) == (5, 3, 2, 0)
+    assert [payload["description"] for payload in server.stored] == ["Dinner", "Power", "Movie"]
@@ -0,0 +1,40 @@
+import datetime
+from datetime import datetime as dt
+
+from src.definitions.enums import Period
+from src.utils.periods import as_request_dates, period_bounds, period_label, shift_anchor, shift_custom_range
+
+
+def test_december_month_ends_in_january():
+    assert period_bounds(Period.MONTH, datetime.date(2025, 12, 17)) == (dt(2025, 12, 1), dt(2026, 1, 1))
+
+
+def test_last_quarter_ends_in_january():
+    assert period_bounds(Period.QUARTER, datetime.date(2025, 11, 30)) == (dt(2025, 10, 1), dt(2026, 1, 1))
+
+
+def test_shift_across_year_boundary():
+    assert shift_anchor(Period.MONTH, datetime.date(2025, 12, 31), 1) == datetime.date(2026, 1, 1)
+    assert shift_anchor(Period.MONTH, datetime.date(2026, 1, 31), -1) == datetime.date(2025, 12, 1)
+    assert shift_anchor(Period.QUARTER, datetime.date(2025, 11, 15), 1) == datetime.date(2026, 2, 1)
+    assert shift_anchor(Period.MONTH, datetime.date(2025, 3, 31), -14) == datetime.date(2024, 1, 1)
+
+
+def test_week_starts_on_monday():
+    start, end = period_bounds(Period.WEEK, datetime.date(2025, 12, 31))
+    assert (start, end) == (dt(2025, 12, 29), dt(2026, 1, 5))
+    assert period_label(Period.WEEK, start, end) == "Dec 29, 2025 - Jan 04, 2026"
+
+
+def test_custom_range_includes_last_day_and_shifts_by_its_length():
+    custom_range = (datetime.date(2025, 12, 25), datetime.date(2026, 1, 3))
+    assert period_bounds(Period.CUSTOM, datetime.date(2025, 12, 1), custom_range) == (dt(2025, 12, 25), dt(2026, 1, 4))
+    assert shift_custom_range(custom_range, 1) == (datetime.date(2026, 1, 4), datetime.date(2026, 1, 13))
+
+
+def test_labels_and_request_dates():
+    start, end = period_bounds(Period.MONTH, datetime.date(2025, 12, 5))
+    assert period_label(Period.MONTH, start, end) == "December 2025"
+    assert as_request_dates(start, end) == ("12-01-2025", "01-01-2026")
+    assert period_label(Period.QUARTER, *period_bounds(Period.QUARTER, datetime.date(2025, 12, 5))) == "Q4 2025"
+    assert period_label(Period.YEAR, *period_bounds(Period.YEAR, datetime.date(2025, 12, 5))) == "2025"
@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.definitions.templates import ExpenseFilter
+from src.services.replica import LOCAL_SUMMARY_LABEL, LocalReplica, summarize
+
+
+class HistoryStub:
+    # The history endpoint: rows in date order, optionally only those stored after an id.
+    def __init__(self, supports_after: bool = True):
+        self.supports_after = supports_after
+        self.rows: List[Dict[str, Any]] = []
+        self.requests: List[Dict[str, Any]] = []
+        self.last_id = 0
+
+    def add(self, day: int, amount: float, with_id: bool = True):
+        row = dict(category="Food", description=f"day {day}", amount=amount, date=f"2025-12-{day:02d}T00:00:00Z")
+        if with_id:
+            self.last_id += 1
+            row["_id"] = f"{self.last_id:024x}"
+        self.rows.append(row)
+        self.rows.sort(key=lambda row: row["date"])
+
+    def get_historical_page(self, username: str, offset: int, limit: int, use_cache: bool = True,
+                            after: Optional[str] = None):
+        self.requests.append(dict(offset=offset, after=after))
+        rows = self.rows
+        if after and self.supports_after:
+            rows = [row for row in rows if row["_id"] > after]
+        return rows[offset:offset + limit], len(rows) > offset + limit
+
+
+@pytest.fixture
+def replica_for(tmp_path):
+    def make(server: HistoryStub) -> LocalReplica:
+        return LocalReplica(server, path=str(tmp_path / "replica.sqlite3"), max_age=300, page_size=2)
+    return make
+
+
+def test_sync_resumes_after_last_seen_id(replica_for):
+    server = HistoryStub()
+    for day in (1, 5, 9):
+        server.add(day, 10)
+    replica = replica_for(server)
+    assert replica.sync("alice") == 3
+
+    server.add(3, 25)
+    server.requests.clear()
+    assert replica.sync("alice") == 1
+    # One request, for rows after the newest id, instead of walking every page again.
+    assert server.requests == [dict(offset=0, after=f"{3:024x}")]
+    assert replica.stats()["incremental_syncs"] == 1
+    rows, has_more = replica.page("alice", offset=0, limit=10)
+    assert [row["description"] for row in rows] == ["day 1", "day 3", "day 5", "day 9"]
+    assert not has_more
+
+    server.requests.clear()
+    assert replica.sync("alice") == 0
+    assert len(server.requests) == 1
+
+
+def test_backend_without_after_falls_back_to_full_walk(replica_for):
+    server = HistoryStub(supports_after=False)
+    for day in (1, 2, 3):
+        server.add(day, 10)
+    replica = replica_for(server)
+    replica.sync("alice")
+    server.rows.pop(0)
+    server.add(4, 40)
+
+    assert replica.sync("alice") == 3
+    assert replica.stats()["incremental_syncs"] == 0
+    # The full walk also sweeps the row the backend no longer has.
+    assert [row["description"] for row in replica.query("alice")] == ["day 2", "day 3", "day 4"]
+
+
+def test_rows_without_ids_always_walk_everything(replica_for):
+    server = HistoryStub()
+    server.add(1, 10, with_id=False)
+    server.add(2, 10, with_id=False)
+    replica = replica_for(server)
+    replica.sync("alice")
+    server.requests.clear()
+    replica.sync("alice")
+    assert all(request["after"] is None for request in server.requests)
+    assert len(replica.query("alice")) == 2
+
+
+def test_backend_summary_is_kept_until_data_changes(replica_for):
+    server = HistoryStub()
+    server.add(1, 10)
+    replica = replica_for(server)
+    replica.sync("alice")
+    expense_filter = ExpenseFilter()
+    replica.remember_summary("alice", "12-01-2025", "01-01-2026", expense_filter, "You mostly bought food.")
+
+    assert replica.summary("alice", "12-01-2025", "01-01-2026", expense_filter) == "You mostly bought food."
+    assert replica.summary("alice", "12-01-2025", "01-01-2026", ExpenseFilter(categories=("Rent",))) is None
+
+    replica.mark_stale("alice")
+    replica.sync("alice")
+    assert replica.summary("alice", "12-01-2025", "01-01-2026", expense_filter) is None
+
+
+def test_local_summary_is_labelled():
+    summary = summarize([dict(category="Food", amount=10), dict(category="Rent", amount=90)])
+    assert summary.startswith(LOCAL_SUMMARY_LABEL)
+    assert "Rent (90.00)" in summary
+    assert summarize([]) == ""
@@ -0,0 +1,49 @@
+import datetime
+
+from src.app.session_memory import MonthlyRows, compact_frame, get_session_memory
+from src.utils.session_tokens import get_session_tokens
+from src.utils.utils import response_as_dataframe
+from tests.conftest import login
+
+
+def test_idle_session_is_released_after_reruns(app, backend):
+    login(app, backend.data.users[0])
+    assert "monthly_data" in app.session_state
+    # Every run gets a fresh ScriptRunner and session-state wrapper; the sweeper must still reach the session.
+    app.run()
+    app.run()
+    memory = get_session_memory()
+    for record in memory._sessions.values():
+        record.last_active = 0
+    token = app.session_state["session_token"]
+    memory._sweep()
+    # The sweeper only revokes the token and marks the session; the session releases its state on its next run.
+    assert get_session_tokens().verify(token) is None
+    assert "monthly_data" in app.session_state
+    app.run()
+    assert app.session_state["logged_in"] is False
+    assert "monthly_data" not in app.session_state
+    assert "rollup" not in app.session_state
+
+
+def test_monthly_rows_append_without_rebuilding():
+    rows = MonthlyRows(compact_frame(response_as_dataframe([
+        dict(category="Food", description="Lunch", amount=120.0, date="2025-12-01T00:00:00", user="alice"),
+        dict(category="Rent", description="December", amount=9000.0, date="2025-12-02T00:00:00", user="alice"),
+    ])))
+    table = rows.table()
+    rows.append(dict(CATEGORY="Food", DESCRIPTION="Dinner", AMOUNT=300.0, DATE=datetime.date(2025, 12, 3)))
+    rows.append(dict(CATEGORY="Gifts", DESCRIPTION="Present", AMOUNT=50.0, DATE=datetime.date(2025, 12, 4)))
+    assert len(rows) == 4
+
+    grown = rows.table()
+    # The loaded rows are reused as they are; only the new ones were converted.
+    assert grown.num_rows == 4
+    assert grown.column("AMOUNT").chunks[0].equals(table.column("AMOUNT").chunks[0])
+    assert grown.schema.equals(table.schema)
+
+    frame = rows.frame
+    assert list(frame["DESCRIPTION"]) == ["Lunch", "December", "Dinner", "Present"]
+    assert list(frame["CATEGORY"]) == ["Food", "Rent", "Food", "Gifts"]
+    assert [str(dtype) for dtype in frame.dtypes] == ["category", "string", "float64", "date32[day][pyarrow]"]
+    assert rows.table().num_rows == 4
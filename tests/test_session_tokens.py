@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from src.services.cache import ResponseCache
+from src.utils.session_tokens import SessionTokens
+from tests.conftest import login
+
+
+@pytest.fixture
+def tokens() -> SessionTokens:
+    return SessionTokens(secret=b"test-secret", ttl=60, store=ResponseCache(max_entries=100, max_bytes=1 << 20, ttl=60))
+
+
+def test_issued_token_verifies(tokens):
+    claims = tokens.verify(tokens.issue("alice", "Alice"))
+    assert (claims.username, claims.name) == ("alice", "Alice")
+
+
+def test_tampered_token_is_rejected(tokens):
+    body, _, signature = tokens.issue("alice", "Alice").partition(".")
+    other_body = tokens.issue("mallory", "Mallory").partition(".")[0]
+    assert tokens.verify(f"{other_body}.{signature}") is None
+    flipped = "B" if signature[-1] == "A" else "A"
+    assert tokens.verify(f"{body}.{signature[:-1]}{flipped}") is None
+
+
+@pytest.mark.parametrize("token", ["", "abc", "abc.", ".sig", "abc.é", "é.é", "\ud800.x"])
+def test_malformed_token_is_rejected(tokens, token):
+    assert tokens.verify(token) is None
+
+
+def test_token_from_another_secret_is_rejected(tokens):
+    other = SessionTokens(secret=b"other-secret", ttl=60, store=tokens.store)
+    assert tokens.verify(other.issue("alice", "Alice")) is None
+
+
+def test_expired_token_is_rejected(tokens):
+    tokens.ttl = -1
+    assert tokens.verify(tokens.issue("alice", "Alice")) is None
+
+
+def test_revoked_token_is_rejected(tokens):
+    token = tokens.issue("alice", "Alice")
+    other_session = tokens.issue("alice", "Alice")
+    tokens.revoke(token)
+    assert tokens.verify(token) is None
+    assert tokens.verify(other_session) is not None
+    tokens.revoke_user("alice")
+    assert tokens.verify(other_session) is None
+
+
+def _token(at) -> str:
+    token = at.query_params.get("session")
+    return token[0] if isinstance(token, list) else token
+
+
+def test_refresh_restores_login_from_token(app, backend):
+    from streamlit.testing.v1 import AppTest
+    from tests.conftest import APP_PATH
+
+    login(app, backend.data.users[0])
+    refreshed = AppTest.from_file(APP_PATH, default_timeout=30)
+    refreshed.query_params["session"] = _token(app)
+    refreshed.run()
+    assert refreshed.session_state["logged_in"]
+    assert refreshed.session_state["user"] == backend.data.users[0]
+
+
+def test_sign_out_revokes_token(app, backend):
+    from streamlit.testing.v1 import AppTest
+    from tests.conftest import APP_PATH
+
+    login(app, backend.data.users[0])
+    token = _token(app)
+    [button for button in app.button if button.label == "Sign out"][0].click().run()
+    assert "session" not in app.query_params
+
+    reopened = AppTest.from_file(APP_PATH, default_timeout=30)
+    reopened.query_params["session"] = token
+    reopened.run()
+    assert not reopened.session_state["logged_in"]
+
+
+def test_idle_expiry_is_not_undone_by_token(app, backend):
+    from src.app.session_memory import get_session_memory
+
+    login(app, backend.data.users[0])
+    memory = get_session_memory()
+    for record in memory._sessions.values():
+        record.last_active = 0
+    memory._sweep()
+    app.run()
+    assert not app.session_state["logged_in"]
+    assert "session" not in app.query_params
+
+
+def test_active_session_renews_its_token(app, backend):
+    from src.utils.session_tokens import get_session_tokens
+
+    login(app, backend.data.users[0])
+    token = _token(app)
+    app.session_state["session_expires_at"] = time.time()
+    app.run()
+    renewed = _token(app)
+    assert renewed != token
+    assert get_session_tokens().verify(token) is None
+    assert get_session_tokens().verify(renewed) is not None
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.services.streaming import iter_response_tokens
+
+
+def _response(body: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response.raw = _Chunks(body)
+    response.encoding = "utf-8"
+    return response
+
+
+class _Chunks:
+    # A raw body that hands out a few bytes at a time, so events split across reads.
+    def __init__(self, body: bytes, size: int = 7):
+        self.body = body
+        self.size = size
+
+    def stream(self, chunk_size, decode_content=True):
+        for i in range(0, len(self.body), self.size):
+            yield self.body[i:i + self.size]
+
+
+def test_event_stream_tokens_stop_at_done():
+    body = (b'data: {"token": "Hel"}\n\n'
+            b': keep-alive\n\n'
+            b'data: {"token": "lo"}\n\n'
+            b'data: plain text\n\n'
+            b'data: [DONE]\n\n'
+            b'data: {"token": "ignored"}\n\n')
+    assert list(iter_response_tokens(_response(body, "text/event-stream"))) == ["Hel", "lo", "plain text"]
+
+
+def test_event_stream_accepts_message_events():
+    body = b'data: {"message": "whole reply"}\n\ndata: [DONE]\n\n'
+    assert list(iter_response_tokens(_response(body, "text/event-stream; charset=utf-8"))) == ["whole reply"]
+
+
+def test_json_response_is_one_token():
+    body = json.dumps(dict(message="not streamed")).encode()
+    assert list(iter_response_tokens(_response(body, "application/json"))) == ["not streamed"]
+
+
+def test_chunked_text_is_passed_through():
+    assert "".join(iter_response_tokens(_response(b"chunked plain reply", "text/plain"))) == "chunked plain reply"
+
+
+class _ChatStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    streaming = True
+    tokens = ["Str", "eam", "ed"]
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, obj, status=200):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.endswith("stream-message"):
+            if not self.streaming:
+                return self._json(dict(error="not found"), status=404)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in [json.dumps(dict(token=token)) for token in self.tokens] + ["[DONE]"]:
+                chunk = f"data: {event}\n\n".encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self._json(dict(message="Blocking reply"))
+
+
+@pytest.fixture
+def chat_server(monkeypatch):
+    def start(streaming: bool):
+        handler = type("Handler", (_ChatStub,), dict(streaming=streaming))
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        monkeypatch.setenv("SERVER_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}")
+        from src.services.server import Server
+
+        return Server()
+
+    servers = []
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_server_streams_tokens_and_caches_the_reply(chat_server):
+    server = chat_server(streaming=True)
+    assert list(server.stream_message_to_chatbot("alice", "How much did I spend?")) == ["Str", "eam", "ed"]
+    assert server.chat_stream_stats()["completed"] == 1
+    # The assembled reply is now answered from the cache in one piece.
+    assert list(server.stream_message_to_chatbot("alice", "How much did I spend?")) == ["Streamed"]
+
+
+def test_server_falls_back_to_blocking_endpoint(chat_server):
+    server = chat_server(streaming=False)
+    assert list(server.stream_message_to_chatbot("alice", "Hello")) == ["Blocking reply"]
+    assert server.chat_stream_stats()["completed"] == 1
+
+
+def test_cancelled_stream_stops_early(chat_server):
+    server = chat_server(streaming=True)
+    cancel = threading.Event()
+    tokens = []
+    for token in server.stream_message_to_chatbot("alice", "Long answer please", cancel=cancel):
+        tokens.append(token)
+        cancel.set()
+    assert tokens == ["Str"]
+    assert server.chat_stream_stats()["cancelled"] == 1
+
+
+def test_async_server_streams_tokens(chat_server):
+    from src.services.async_server import AsyncServer
+
+    async_server = AsyncServer(chat_server(streaming=True))
+
+    async def collect():
+        return [token async for token in async_server.stream_message_to_chatbot("alice", "Async question")]
+
+    assert asyncio.run(collect()) == ["Str", "eam", "ed"]
+
+
+def test_async_server_stream_cancels_when_left_early(chat_server):
+    from src.services.async_server import AsyncServer
+
+    server = chat_server(streaming=True)
+    async_server = AsyncServer(server)
+
+    async def first_token():
+        stream = async_server.stream_message_to_chatbot("alice", "Stop after one")
+        async for token in stream:
+            await stream.aclose()
+            return token
+
+    assert asyncio.run(first_token()) == "Str"
+    assert server.chat_stream_stats()["cancelled"] == 1
@@ -0,0 +1,36 @@
+from src.definitions.templates import ExpenseFilter
+
+ROWS = [
+    dict(user="alice", category="Food", amount=12.5, description="Lunch"),
+    dict(user="alice", category="Rent", amount=900, description="March"),
+    dict(user="alice", category="Food", amount="40", description="Groceries"),
+    dict(user="bob", category="Food", amount=20, description="Dinner"),
+    dict(category="Travel", amount=None, description="No user column"),
+]
+
+
+def test_empty_filter_keeps_the_users_rows():
+    assert ExpenseFilter().as_payload() == {}
+    assert ExpenseFilter().apply(ROWS, "alice") == [ROWS[0], ROWS[1], ROWS[2], ROWS[4]]
+
+
+def test_category_and_amount_bounds_are_inclusive():
+    expense_filter = ExpenseFilter(categories=("Food",), min_amount=12.5, max_amount=40)
+    assert [row["description"] for row in expense_filter.apply(ROWS, "alice")] == ["Lunch", "Groceries"]
+    assert not ExpenseFilter(max_amount=12.49).matches(ROWS[0], "alice")
+    # A missing amount counts as zero.
+    assert not ExpenseFilter(min_amount=1).matches(ROWS[4], "alice")
+
+
+def test_fields_project_rows():
+    expense_filter = ExpenseFilter(categories=("Rent",), fields=("amount", "category"))
+    assert expense_filter.apply(ROWS, "alice") == [dict(category="Rent", amount=900)]
+
+
+def test_payload_only_carries_set_parameters():
+    assert ExpenseFilter(categories=("Food", "Rent"), min_amount=0.0, fields=("amount",)).as_payload() == dict(
+        categories=["Food", "Rent"], min_amount=0.0, fields=["amount"])
+
+
+def test_filter_is_hashable_for_cache_keys():
+    assert hash(ExpenseFilter(categories=("Food",))) == hash(ExpenseFilter(categories=("Food",)))
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from src.services.write_behind import FAILED, PENDING, WriteBehindQueue
+
+
+class RecordingServer:
+    def __init__(self, batch_code=200, row_code=200):
+        self.batch_code = batch_code
+        self.row_code = row_code
+        self.batch_calls = []
+        self.row_calls = []
+        self.batch_store_supported = True
+
+    def store_batch_to_db(self, username, payloads):
+        self.batch_calls.append((username, payloads))
+        return self.batch_code
+
+    def store_data_to_db(self, payload):
+        self.row_calls.append(payload)
+        return self.row_code
+
+    def store_expenses(self, username, payloads):
+        from src.services.server import Server
+
+        return Server.store_expenses(self, username, payloads)
+
+
+class ManualQueue(WriteBehindQueue):
+    # No background worker; the tests flush explicitly.
+    def _run(self):
+        pass
+
+
+def _queue(tmp_path, server, **overrides) -> WriteBehindQueue:
+    options = dict(batch_size=50, max_attempts=2, flush_interval=3600, backoff=0)
+    options.update(overrides)
+    return ManualQueue(server=server, path=str(tmp_path / "journal.sqlite3"), **options)
+
+
+def _expense(user, i):
+    return dict(username=user, category="Leisure", description=f"expense {i}", amount=str(i), date=time.time() * 1000)
+
+
+def test_entries_are_sent_as_one_bulk_store_per_user(tmp_path):
+    server = RecordingServer()
+    queue = _queue(tmp_path, server)
+    for i in range(3):
+        queue.enqueue(_expense("alice", i))
+    queue.enqueue(_expense("bob", 9))
+    assert queue.flush() == 4
+    assert sorted((user, len(payloads)) for user, payloads in server.batch_calls) == [("alice", 3), ("bob", 1)]
+    assert server.row_calls == []
+    assert queue.counts("alice") == {PENDING: 0, FAILED: 0}
+
+
+def test_falls_back_to_per_row_stores_without_bulk_route(tmp_path):
+    server = RecordingServer(batch_code=404)
+    queue = _queue(tmp_path, server)
+    for i in range(3):
+        queue.enqueue(_expense("alice", i))
+    assert queue.flush() == 3
+    assert len(server.batch_calls) == 1
+    assert [payload["description"] for payload in server.row_calls] == ["expense 0", "expense 1", "expense 2"]
+    assert server.batch_store_supported is False
+
+
+def test_failed_entries_are_retried_then_marked_failed(tmp_path):
+    server = RecordingServer(batch_code=500)
+    queue = _queue(tmp_path, server, max_attempts=2)
+    queue.enqueue(_expense("alice", 1))
+    assert queue.flush() == 0
+    assert queue.counts("alice") == {PENDING: 1, FAILED: 0}
+    assert queue.flush() == 0
+    assert queue.counts("alice") == {PENDING: 0, FAILED: 1}
+    server.batch_code = 200
+    queue.retry_failed("alice")
+    assert queue.flush() == 1
+    assert queue.counts("alice") == {PENDING: 0, FAILED: 0}
+
+
+def test_journal_is_replayed_by_a_new_process(tmp_path):
+    # Entries that were never delivered are picked up by the next queue on the same file, in order.
+    down = RecordingServer(batch_code=503)
+    first = _queue(tmp_path, down)
+    for i in range(3):
+        first.enqueue(_expense("alice", i))
+    first.flush()
+
+    up = RecordingServer()
+    second = _queue(tmp_path, up)
+    assert second.flush() == 3
+    (user, payloads), = up.batch_calls
+    assert user == "alice"
+    assert [payload["description"] for payload in payloads] == ["expense 0", "expense 1", "expense 2"]
+
+
+@pytest.mark.parametrize("code", [None, 500])
+def test_connection_errors_keep_entries_pending(tmp_path, code):
+    class DownServer(RecordingServer):
+        def store_batch_to_db(self, username, payloads):
+            if code is None:
+                raise ConnectionError("backend down")
+            return code
+
+    queue = _queue(tmp_path, DownServer(), max_attempts=5)
+    queue.enqueue(_expense("alice", 1))
+    assert queue.flush() == 0
+    assert queue.counts("alice")[PENDING] == 1